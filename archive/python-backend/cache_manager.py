@@ -0,0 +1,178 @@
+"""
+Central memory-bounded cache for WesWorld FX
+Warp maps, polar grids, animation keyframes and color LUTs all register a
+namespace here, so the whole backend shares one byte budget with LRU eviction
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+import numpy as np
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+
+def estimate_nbytes(value: Any) -> int:
+    """Approximate memory held by a cached value (arrays, tuples of arrays, objects)"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_nbytes(item) for item in value)
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(item) for item in value.values())
+    if hasattr(value, '__dict__'):
+        return estimate_nbytes(vars(value))
+    return 0
+
+
+def content_hash(image: np.ndarray) -> bytes:
+    """128-bit digest of an array's shape, dtype and contents, for keying results by image content"""
+    data = np.ascontiguousarray(image)
+    digest = xxhash.xxh3_128() if XXHASH_AVAILABLE else hashlib.blake2b(digest_size=16)
+    digest.update(f'{data.shape}{data.dtype}'.encode())
+    digest.update(memoryview(data).cast('B'))
+    return digest.digest()
+
+
+class CacheNamespace:
+    """Handle to one namespace of the cache manager, used like a small dict"""
+
+    def __init__(self, manager: 'CacheManager', name: str):
+        self.manager = manager
+        self.name = name
+
+    def get(self, key: Hashable) -> Any:
+        return self.manager.get(self.name, key)
+
+    def put(self, key: Hashable, value: Any, nbytes: Optional[int] = None) -> Any:
+        return self.manager.put(self.name, key, value, nbytes)
+
+    def clear(self):
+        self.manager.clear(self.name)
+
+    def __len__(self) -> int:
+        return self.manager.stats()['namespaces'][self.name]['entries']
+
+
+class CacheManager:
+    """Byte-budgeted LRU cache with per-namespace quotas and hit/miss/eviction counters"""
+
+    def __init__(self, budget_bytes: int = 512 * 1024 * 1024):
+        self.budget_bytes = budget_bytes
+        self.total_bytes = 0
+        self._lock = threading.RLock()
+        self._tick = 0
+        # namespace -> OrderedDict(key -> (value, nbytes, last_used)), least recently used first
+        self._entries: Dict[str, OrderedDict] = {}
+        self._namespaces: Dict[str, Dict[str, Any]] = {}
+
+    def namespace(self, name: str, quota_bytes: Optional[int] = None,
+                  max_entries: Optional[int] = None) -> CacheNamespace:
+        """Register (or look up) a namespace; quotas given here replace earlier ones"""
+        with self._lock:
+            if name not in self._namespaces:
+                self._entries[name] = OrderedDict()
+                self._namespaces[name] = {
+                    'quota_bytes': None, 'max_entries': None, 'bytes': 0,
+                    'hits': 0, 'misses': 0, 'evictions': 0,
+                }
+            info = self._namespaces[name]
+            if quota_bytes is not None:
+                info['quota_bytes'] = quota_bytes
+            if max_entries is not None:
+                info['max_entries'] = max_entries
+            self._enforce(name)
+            return CacheNamespace(self, name)
+
+    def get(self, namespace: str, key: Hashable) -> Any:
+        with self._lock:
+            entries = self._entries[namespace]
+            entry = entries.get(key)
+            if entry is None:
+                self._namespaces[namespace]['misses'] += 1
+                return None
+            self._tick += 1
+            entries[key] = (entry[0], entry[1], self._tick)
+            entries.move_to_end(key)
+            self._namespaces[namespace]['hits'] += 1
+            return entry[0]
+
+    def put(self, namespace: str, key: Hashable, value: Any, nbytes: Optional[int] = None) -> Any:
+        """Store a value and evict least recently used entries until quotas and budget hold"""
+        if nbytes is None:
+            nbytes = estimate_nbytes(value)
+        with self._lock:
+            entries = self._entries[namespace]
+            if key in entries:
+                self._remove(namespace, key)
+            self._tick += 1
+            entries[key] = (value, nbytes, self._tick)
+            self._namespaces[namespace]['bytes'] += nbytes
+            self.total_bytes += nbytes
+            self._enforce(namespace)
+            return value
+
+    def clear(self, namespace: Optional[str] = None):
+        with self._lock:
+            for name in [namespace] if namespace else list(self._entries):
+                for key in list(self._entries[name]):
+                    self._remove(name, key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of sizes and hit/miss/eviction counters, overall and per namespace"""
+        with self._lock:
+            namespaces = {
+                name: dict(info, entries=len(self._entries[name]))
+                for name, info in self._namespaces.items()
+            }
+            return {
+                'budget_bytes': self.budget_bytes,
+                'total_bytes': self.total_bytes,
+                'entries': sum(info['entries'] for info in namespaces.values()),
+                'hits': sum(info['hits'] for info in namespaces.values()),
+                'misses': sum(info['misses'] for info in namespaces.values()),
+                'evictions': sum(info['evictions'] for info in namespaces.values()),
+                'namespaces': namespaces,
+            }
+
+    def _remove(self, namespace: str, key: Hashable):
+        _, nbytes, _ = self._entries[namespace].pop(key)
+        self._namespaces[namespace]['bytes'] -= nbytes
+        self.total_bytes -= nbytes
+
+    def _evict_oldest(self, namespace: str):
+        key = next(iter(self._entries[namespace]))
+        self._remove(namespace, key)
+        self._namespaces[namespace]['evictions'] += 1
+
+    def _enforce(self, namespace: str):
+        # The newest entry of a namespace is always kept, even if it alone exceeds a limit
+        entries = self._entries[namespace]
+        info = self._namespaces[namespace]
+        while len(entries) > 1 and (
+                (info['quota_bytes'] is not None and info['bytes'] > info['quota_bytes']) or
+                (info['max_entries'] is not None and len(entries) > info['max_entries'])):
+            self._evict_oldest(namespace)
+        while self.total_bytes > self.budget_bytes:
+            # Evict the globally least recently used entry: the oldest head across namespaces
+            candidates = [(next(iter(e.values()))[2], name) for name, e in self._entries.items()
+                          if e and not (name == namespace and len(e) == 1)]
+            if not candidates:
+                break
+            self._evict_oldest(min(candidates)[1])
+
+
+# Global cache manager shared by every FaceFilter and connection
+_cache_manager = None
+
+def get_cache_manager() -> CacheManager:
+    """Get or create the process-wide cache manager"""
+    global _cache_manager
+    if _cache_manager is None:
+        _cache_manager = CacheManager()
+    return _cache_manager
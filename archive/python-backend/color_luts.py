@@ -0,0 +1,194 @@
+"""
+Point-operation lookup tables for WesWorld FX color filters
+Every table is built once at import so filters run as a single uint8 cv2.LUT pass
+"""
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from cache_manager import get_cache_manager
+
+
+_IDENTITY = np.arange(256, dtype=np.uint8)
+
+
+def _table(values: np.ndarray) -> np.ndarray:
+    """Clip a 256-entry table to uint8 and shape it for cv2.LUT"""
+    return np.clip(values, 0, 255).astype(np.uint8).reshape(256, 1)
+
+
+def _channel_table(channel: int, values: np.ndarray) -> np.ndarray:
+    """Per-channel BGR table that only changes one channel"""
+    table = np.repeat(_IDENTITY.reshape(256, 1, 1), 3, axis=2)
+    table[:, 0, channel] = _table(values)[:, 0]
+    return table
+
+
+NEGATIVE = _table(255 - _IDENTITY.astype(np.int16))
+POSTERIZE = _table((_IDENTITY // 32) * 32)
+SOLARIZE = _table(np.where(_IDENTITY > 128, 255 - _IDENTITY.astype(np.int16), _IDENTITY))
+
+_TINT = np.arange(256) * 1.5
+BLUE_TINT = _channel_table(0, _TINT)
+GREEN_TINT = _channel_table(1, _TINT)
+RED_TINT = _channel_table(2, _TINT)
+
+# User colormaps for cv2.applyColorMap(gray, lut), sampled from the built-in OpenCV maps
+COLORMAPS: Dict[int, np.ndarray] = {
+    colormap: cv2.applyColorMap(_IDENTITY.reshape(256, 1), colormap)
+    for colormap in (cv2.COLORMAP_HOT, cv2.COLORMAP_WINTER, cv2.COLORMAP_OCEAN, cv2.COLORMAP_PLASMA,
+                     cv2.COLORMAP_JET, cv2.COLORMAP_TURBO, cv2.COLORMAP_INFERNO, cv2.COLORMAP_MAGMA,
+                     cv2.COLORMAP_VIRIDIS, cv2.COLORMAP_COOL, cv2.COLORMAP_SPRING, cv2.COLORMAP_SUMMER,
+                     cv2.COLORMAP_AUTUMN)
+}
+for _lut in (NEGATIVE, POSTERIZE, SOLARIZE, BLUE_TINT, GREEN_TINT, RED_TINT, *COLORMAPS.values()):
+    _lut.setflags(write=False)
+
+
+def apply_lut(image: np.ndarray, table: np.ndarray) -> np.ndarray:
+    """Map every uint8 value of an image through a 256-entry table"""
+    return cv2.LUT(image, table)
+
+
+def apply_colormap(gray: np.ndarray, colormap: int) -> np.ndarray:
+    """Colorize a grayscale image with a precomputed OpenCV colormap"""
+    return cv2.applyColorMap(gray, COLORMAPS[colormap])
+
+
+# 3D color pipelines: a chain of per-pixel color ops is evaluated once on a
+# 256 x LATTICE_SIZE x LATTICE_SIZE BGR lattice (every blue level, sampled green
+# and red) and applied with one bilinear remap into the unwrapped lattice
+LATTICE_SIZE = 33
+
+ColorOp = Tuple
+
+
+def matrix_op(matrix) -> ColorOp:
+    """3x3 BGR color matrix, as applied by cv2.transform (e.g. sepia)"""
+    return ('matrix', tuple(tuple(float(v) for v in row) for row in matrix))
+
+
+def gains_op(blue: float = 1.0, green: float = 1.0, red: float = 1.0) -> ColorOp:
+    """Per-channel multipliers"""
+    return ('gains', (float(blue), float(green), float(red)))
+
+
+def hue_rotate_op(shift: int) -> ColorOp:
+    """Hue rotation in OpenCV 8-bit hue units (0-180)"""
+    return ('hue_rotate', int(shift))
+
+
+def value_gain_op(gain: float) -> ColorOp:
+    """HSV value (brightness) multiplier"""
+    return ('value_gain', float(gain))
+
+
+def colormap_op(colormap: int) -> ColorOp:
+    """Grayscale conversion followed by an OpenCV colormap"""
+    return ('colormap', int(colormap))
+
+
+def _eval_matrix(bgr: np.ndarray, matrix) -> np.ndarray:
+    return bgr @ np.float32(matrix).T
+
+
+def _eval_gains(bgr: np.ndarray, gains) -> np.ndarray:
+    return bgr * np.float32(gains)
+
+
+def _eval_hue_rotate(bgr: np.ndarray, shift: int) -> np.ndarray:
+    hsv = cv2.cvtColor(bgr * np.float32(1 / 255.0), cv2.COLOR_BGR2HSV)
+    hsv[..., 0] = (hsv[..., 0] + shift * 2.0) % 360.0
+    return cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR) * np.float32(255.0)
+
+
+def _eval_value_gain(bgr: np.ndarray, gain: float) -> np.ndarray:
+    hsv = cv2.cvtColor(bgr * np.float32(1 / 255.0), cv2.COLOR_BGR2HSV)
+    hsv[..., 2] = np.clip(hsv[..., 2] * gain, 0, 1)
+    return cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR) * np.float32(255.0)
+
+
+def _eval_colormap(bgr: np.ndarray, colormap: int) -> np.ndarray:
+    gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+    table = COLORMAPS[colormap][:, 0].astype(np.float32)
+    positions = np.arange(256, dtype=np.float32)
+    return np.stack([np.interp(gray, positions, table[:, c]) for c in range(3)], axis=-1).astype(np.float32)
+
+
+_COLOR_OPS = {
+    'matrix': _eval_matrix,
+    'gains': _eval_gains,
+    'hue_rotate': _eval_hue_rotate,
+    'value_gain': _eval_value_gain,
+    'colormap': _eval_colormap,
+}
+
+
+def _linear_matrix(ops: Tuple[ColorOp, ...]) -> Optional[np.ndarray]:
+    """The 3x3 matrix of a pipeline that is a single matrix or gains op, else None"""
+    if len(ops) != 1:
+        return None
+    name, arg = ops[0]
+    if name == 'matrix':
+        return np.float32(arg)
+    if name == 'gains':
+        return np.diag(np.float32(arg))
+    return None
+
+
+class ColorPipeline:
+    """
+    A chain of color ops compiled into a 3D LUT. A lone matrix or gains op skips the
+    lattice: cv2.transform applies it to uint8 directly, saturating, in one cheaper pass
+    """
+    
+    def __init__(self, ops: Tuple[ColorOp, ...], size: int = LATTICE_SIZE):
+        self.ops = ops
+        self.size = size
+        self.matrix = _linear_matrix(ops)
+        if self.matrix is not None:
+            return
+        nodes = np.linspace(0, 255, size, dtype=np.float32)
+        # Lattice unwrapped into one image: rows are green nodes, columns are red node + blue * size
+        g, b, r = np.meshgrid(nodes, np.arange(256, dtype=np.float32), nodes, indexing='ij')
+        bgr = np.stack([b, g, r], axis=-1).reshape(size, 256 * size, 3)
+        for name, arg in ops:
+            bgr = np.clip(_COLOR_OPS[name](np.ascontiguousarray(bgr, dtype=np.float32), arg), 0, 255)
+        self.lut = np.round(bgr).astype(np.uint8)
+        
+        # Fixed-point remap tables: integer node index plus a 1/INTER_TAB_SIZE fraction
+        tab_size = cv2.INTER_TAB_SIZE
+        steps = np.round(np.arange(256) * (size - 1) * tab_size / 255.0).astype(np.int32)
+        self.node_table = (steps // tab_size).astype(np.int16).reshape(256, 1)
+        self.slice_table = (np.arange(256) * size).astype(np.int16).reshape(256, 1)
+        self.x_frac_table = (steps % tab_size).astype(np.uint16).reshape(256, 1)
+        self.y_frac_table = (steps % tab_size * tab_size).astype(np.uint16).reshape(256, 1)
+    
+    def apply(self, image: np.ndarray) -> np.ndarray:
+        """Map a BGR uint8 image through the pipeline"""
+        if self.matrix is not None:
+            return cv2.transform(image, self.matrix)
+        blue, green, red = cv2.split(image)
+        map_x = cv2.add(cv2.LUT(red, self.node_table), cv2.LUT(blue, self.slice_table))
+        map_y = cv2.LUT(green, self.node_table)
+        fractions = cv2.add(cv2.LUT(red, self.x_frac_table), cv2.LUT(green, self.y_frac_table))
+        return cv2.remap(self.lut, cv2.merge([map_x, map_y]), fractions, cv2.INTER_LINEAR,
+                         borderMode=cv2.BORDER_REPLICATE)
+
+
+_pipelines = get_cache_manager().namespace('color_pipelines', max_entries=32)
+
+
+def compile_pipeline(ops: Tuple[ColorOp, ...]) -> ColorPipeline:
+    """Compile a tuple of color ops, first to last, into a cached ColorPipeline"""
+    ops = tuple(ops)
+    pipeline = _pipelines.get(ops)
+    if pipeline is None:
+        pipeline = _pipelines.put(ops, ColorPipeline(ops))
+    return pipeline
+
+
+SEPIA_MATRIX = ((0.272, 0.534, 0.131),
+                (0.349, 0.686, 0.168),
+                (0.393, 0.769, 0.189))
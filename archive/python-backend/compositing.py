@@ -0,0 +1,193 @@
+"""
+Alpha compositing for WesWorld FX
+Layers keep their color premultiplied by alpha in 8.8 fixed point, so blending into a
+frame is one uint16 multiply-add-shift written in place, with no float temporaries.
+Transformed layers are warped in one pass straight into buffers the size of the ROI
+they cover, or remapped through precomputed rotation maps
+"""
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+# Alpha is stored scaled to 0..ALPHA_ONE; color * alpha then fits comfortably in uint16
+ALPHA_SHIFT = 8
+ALPHA_ONE = 1 << ALPHA_SHIFT
+# Added to the premultiplied color so the final shift rounds instead of truncating
+ROUNDING = ALPHA_ONE // 2
+
+
+class Layer(NamedTuple):
+    """
+    A BGR image ready to composite. For translucent layers premultiplied holds
+    color * alpha * 256 + 128 and inverse_alpha holds 256 - alpha * 256 (both uint16);
+    both are None for fully opaque layers, which are simply copied
+    """
+    color: np.ndarray
+    premultiplied: Optional[np.ndarray]
+    inverse_alpha: Optional[np.ndarray]
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.color.shape[:2]
+
+
+def premultiply(bgr: np.ndarray, alpha: Optional[np.ndarray] = None, opacity: float = 1.0) -> Layer:
+    """Layer from a uint8 BGR image and an optional float alpha plane in [0, 1], scaled by opacity"""
+    if alpha is None and opacity >= 1.0:
+        return Layer(bgr, None, None)
+    if alpha is None:
+        alpha = np.ones(bgr.shape[:2], dtype=np.float32)
+    alpha = np.rint(alpha * (ALPHA_ONE * opacity)).astype(np.uint16)
+    premultiplied = bgr.astype(np.uint16)
+    premultiplied *= alpha[:, :, np.newaxis]
+    premultiplied += ROUNDING
+    return Layer(bgr, premultiplied, ALPHA_ONE - alpha)
+
+
+def fade(layer: Layer, opacity: float) -> Layer:
+    """The same layer with its alpha multiplied by opacity"""
+    alpha = None
+    if layer.inverse_alpha is not None:
+        alpha = (ALPHA_ONE - layer.inverse_alpha).astype(np.float32) * np.float32(1 / ALPHA_ONE)
+    return premultiply(layer.color, alpha, opacity)
+
+
+def blend(dst: np.ndarray, layer: Layer, scratch: Optional['Scratch'] = None):
+    """Composite a layer over a uint8 BGR image of the same size, in place"""
+    if layer.premultiplied is None:
+        dst[...] = layer.color
+        return
+    _blend_planes(dst, layer.premultiplied, layer.inverse_alpha, scratch)
+
+
+def _blend_planes(dst: np.ndarray, premultiplied: np.ndarray, inverse_alpha: np.ndarray,
+                  scratch: Optional['Scratch'] = None):
+    blended = scratch.get('blended', dst.shape, np.uint16) if scratch is not None else None
+    blended = np.multiply(dst, inverse_alpha[:, :, np.newaxis], out=blended, dtype=np.uint16)
+    blended += premultiplied
+    blended >>= ALPHA_SHIFT
+    dst[...] = blended
+
+
+def composite(dst: np.ndarray, layer: Layer, x: int, y: int, scratch: Optional['Scratch'] = None):
+    """Composite a layer with its top-left corner at (x, y), clipped to dst, in place"""
+    layer_h, layer_w = layer.shape
+    dst_h, dst_w = dst.shape[:2]
+    x0, y0 = max(0, x), max(0, y)
+    x1, y1 = min(dst_w, x + layer_w), min(dst_h, y + layer_h)
+    if x1 <= x0 or y1 <= y0:
+        return
+    crop = (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x))
+    blend(dst[y0:y1, x0:x1], Layer(
+        layer.color[crop],
+        layer.premultiplied[crop] if layer.premultiplied is not None else None,
+        layer.inverse_alpha[crop] if layer.inverse_alpha is not None else None,
+    ), scratch)
+
+
+def place(dst: np.ndarray, layer: Layer, matrix: np.ndarray, scratch: Optional['Scratch'] = None):
+    """
+    Composite a layer transformed by a 2x3 affine matrix (layer pixels to dst pixels) in
+    one resample: it is warped straight into buffers covering only the dst ROI it lands on
+    """
+    layer_h, layer_w = layer.shape
+    corners = np.array([[0, 0, 1], [layer_w, 0, 1], [0, layer_h, 1], [layer_w, layer_h, 1]], dtype=np.float64)
+    corners = corners @ matrix.T
+    dst_h, dst_w = dst.shape[:2]
+    x0, y0 = np.maximum(np.floor(corners.min(axis=0)).astype(int), 0)
+    x1, y1 = np.minimum(np.ceil(corners.max(axis=0)).astype(int), (dst_w, dst_h))
+    if x1 <= x0 or y1 <= y0:
+        return
+    if layer.premultiplied is None:
+        layer = premultiply(layer.color, np.ones(layer.shape, dtype=np.float32))
+    shifted = matrix.astype(np.float64)
+    shifted[:, 2] -= (x0, y0)
+    size = (int(x1 - x0), int(y1 - y0))
+    premultiplied = cv2.warpAffine(
+        layer.premultiplied, shifted, size,
+        dst=scratch.get('premultiplied', (size[1], size[0], 3), np.uint16) if scratch is not None else None,
+        flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT, borderValue=(ROUNDING,) * 3)
+    inverse_alpha = cv2.warpAffine(
+        layer.inverse_alpha, shifted, size,
+        dst=scratch.get('inverse_alpha', (size[1], size[0]), np.uint16) if scratch is not None else None,
+        flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT, borderValue=ALPHA_ONE)
+    _blend_planes(dst[y0:y1, x0:x1], premultiplied, inverse_alpha, scratch)
+
+
+def rotation_maps(width: int, height: int, angle: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fixed-point remap maps that rotate a width x height layer by angle degrees (as
+    cv2.getRotationMatrix2D) about its center into its enlarged bounding box
+    """
+    radians = np.radians(abs(angle))
+    rotated_w = int(width * abs(np.cos(radians)) + height * abs(np.sin(radians)))
+    rotated_h = int(width * abs(np.sin(radians)) + height * abs(np.cos(radians)))
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    matrix[0, 2] += (rotated_w - width) / 2
+    matrix[1, 2] += (rotated_h - height) / 2
+    inverse = cv2.invertAffineTransform(matrix)
+    xs, ys = np.meshgrid(np.arange(rotated_w, dtype=np.float32), np.arange(rotated_h, dtype=np.float32))
+    map_x = inverse[0, 0] * xs + inverse[0, 1] * ys + inverse[0, 2]
+    map_y = inverse[1, 0] * xs + inverse[1, 1] * ys + inverse[1, 2]
+    return cv2.convertMaps(map_x.astype(np.float32), map_y.astype(np.float32), cv2.CV_16SC2)
+
+
+def place_remapped(dst: np.ndarray, layer: Layer, maps: Tuple[np.ndarray, np.ndarray], x: int, y: int,
+                   scratch: Optional['Scratch'] = None):
+    """
+    Composite a layer resampled through remap maps (see rotation_maps) with the maps'
+    top-left corner at (x, y); only the part of the maps that lands inside dst is evaluated
+    """
+    map1, map2 = maps
+    map_h, map_w = map1.shape[:2]
+    dst_h, dst_w = dst.shape[:2]
+    x0, y0 = max(0, x), max(0, y)
+    x1, y1 = min(dst_w, x + map_w), min(dst_h, y + map_h)
+    if x1 <= x0 or y1 <= y0:
+        return
+    if layer.premultiplied is None:
+        layer = premultiply(layer.color, np.ones(layer.shape, dtype=np.float32))
+    crop = (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x))
+    map1, map2 = map1[crop], map2[crop]
+    size = (x1 - x0, y1 - y0)
+    premultiplied = cv2.remap(
+        layer.premultiplied, map1, map2, cv2.INTER_LINEAR,
+        dst=scratch.get('premultiplied', (size[1], size[0], 3), np.uint16) if scratch is not None else None,
+        borderMode=cv2.BORDER_CONSTANT, borderValue=(ROUNDING,) * 3)
+    inverse_alpha = cv2.remap(
+        layer.inverse_alpha, map1, map2, cv2.INTER_LINEAR,
+        dst=scratch.get('inverse_alpha', (size[1], size[0]), np.uint16) if scratch is not None else None,
+        borderMode=cv2.BORDER_CONSTANT, borderValue=ALPHA_ONE)
+    _blend_planes(dst[y0:y1, x0:x1], premultiplied, inverse_alpha, scratch)
+
+
+class Scratch:
+    """Reusable output buffers, grown as needed, so steady-state compositing allocates nothing"""
+
+    def __init__(self):
+        self._buffers: Dict[str, np.ndarray] = {}
+
+    def get(self, name: str, shape: Tuple[int, ...], dtype) -> np.ndarray:
+        """A view of exactly shape into the named buffer (contents undefined)"""
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.dtype != dtype or buffer.ndim != len(shape) or \
+                any(have < want for have, want in zip(buffer.shape, shape)):
+            grown = shape if buffer is None or buffer.ndim != len(shape) else \
+                tuple(max(have, want) for have, want in zip(buffer.shape, shape))
+            buffer = self._buffers[name] = np.empty(grown, dtype=dtype)
+        return buffer[tuple(slice(0, n) for n in shape)]
+
+
+def tint(dst: np.ndarray, x0: int, y0: int, x1: int, y1: int, color: Tuple[int, int, int], alpha: float):
+    """Blend a solid color over a rectangle of dst at a constant alpha, in place (for translucent UI panels)"""
+    roi = dst[max(0, y0):max(0, y1), max(0, x0):max(0, x1)]
+    if roi.size == 0:
+        return
+    weight = int(round(alpha * ALPHA_ONE))
+    blended = roi.astype(np.uint16)
+    blended *= ALPHA_ONE - weight
+    blended += np.array(color, dtype=np.uint16) * weight + ROUNDING
+    blended >>= ALPHA_SHIFT
+    roi[...] = blended
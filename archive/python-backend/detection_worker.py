@@ -0,0 +1,119 @@
+"""
+Background face detection for WesWorld FX
+A daemon thread runs detection on the newest submitted frame and publishes the
+latest result by a single reference swap, so render loops never wait on it
+"""
+import threading
+import time
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from frame_context import FrameContext
+
+
+class DetectionResult(NamedTuple):
+    """Faces (and optionally landmarks) found in one frame, with the gray frame they came from"""
+    faces: List[Tuple[int, int, int, int]]
+    landmarks: Optional[List[dict]]
+    gray: np.ndarray
+    frame_index: int
+    timestamp: float
+
+
+class DetectionWorker:
+    """Runs detection at its own rate on the most recent frame handed to it"""
+
+    def __init__(self, detect_faces: Callable[[np.ndarray, FrameContext], List[Tuple[int, int, int, int]]],
+                 detect_landmarks: Optional[Callable[[np.ndarray, FrameContext], List[dict]]] = None,
+                 min_interval: float = 0.0, landmark_idle_frames: int = 30):
+        self.detect_faces = detect_faces
+        self.detect_landmarks = detect_landmarks
+        # Minimum seconds between detections, to leave CPU to the render loop
+        self.min_interval = min_interval
+        # Landmarks are only detected until this many frames after the last submit that asked for them
+        self.landmark_idle_frames = landmark_idle_frames
+        self.frame_index = 0
+        self.detections = 0
+        # Single-slot handoffs: each side only ever replaces a whole reference
+        self._pending: Optional[Tuple[int, FrameContext]] = None
+        self._latest: Optional[DetectionResult] = None
+        self._landmarks_wanted = None
+        self._wake = threading.Event()
+        self._published = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name='face-detection', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def submit(self, frame: np.ndarray, context: Optional[FrameContext] = None, landmarks: bool = False) -> int:
+        """
+        Offer a frame for detection, with landmarks if asked; older frames that were not
+        picked up yet are dropped. Returns the frame's index, for wait()
+        """
+        self.frame_index += 1
+        if landmarks:
+            self._landmarks_wanted = self.frame_index
+        # Detection reuses the render loop's derived images of the frame (gray, RGB, ...)
+        if context is None or context.frame is not frame:
+            context = FrameContext(frame)
+        self._pending = (self.frame_index, context)
+        self._wake.set()
+        return self.frame_index
+
+    def latest(self) -> Optional[DetectionResult]:
+        """Most recent published result, without waiting"""
+        return self._latest
+
+    def wait(self, frame_index: int, timeout: float, landmarks: bool = False) -> Optional[DetectionResult]:
+        """
+        Block until a result for frame_index or a later frame (with landmarks if asked) is
+        published, or the timeout passes; then the most recent result, which may be older or None
+        """
+        def ready():
+            result = self._latest
+            return (result is not None and result.frame_index >= frame_index
+                    and (not landmarks or result.landmarks is not None))
+        with self._published:
+            self._published.wait_for(ready, timeout)
+        return self._latest
+
+    def _wants_landmarks(self, frame_index: int) -> bool:
+        wanted = self._landmarks_wanted
+        return (self.detect_landmarks is not None and wanted is not None
+                and frame_index - wanted <= self.landmark_idle_frames)
+
+    def _loop(self):
+        while self._running:
+            self._wake.wait()
+            self._wake.clear()
+            pending, self._pending = self._pending, None
+            if pending is None:
+                continue
+            frame_index, context = pending
+            started = time.time()
+            try:
+                faces = self.detect_faces(context.frame, context)
+                landmarks = self.detect_landmarks(context.frame, context) if self._wants_landmarks(frame_index) else None
+            except Exception as e:
+                print(f"Warning: Face detection failed: {e}")
+                continue
+            with self._published:
+                self._latest = DetectionResult(list(faces), landmarks, context.gray(), frame_index, started)
+                self._published.notify_all()
+            self.detections += 1
+            remaining = self.min_interval - (time.time() - started)
+            if remaining > 0:
+                time.sleep(remaining)
@@ -0,0 +1,226 @@
+"""
+Interchangeable face detector backends for WesWorld FX
+Haar and LBP cascades, the OpenCV DNN res10 SSD and MediaPipe FaceDetection share
+one interface, and a small benchmark on a bundled test set picks the fastest one
+that agrees well enough with the Haar baseline on the host CPU
+"""
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from frame_context import FrameContext
+
+try:
+    import mediapipe as mp
+    MEDIAPIPE_AVAILABLE = True
+except ImportError:
+    MEDIAPIPE_AVAILABLE = False
+
+
+Box = Tuple[int, int, int, int]
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+TEST_SET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'detector_testset.json')
+
+# Model files expected in MODEL_DIR for the backends that OpenCV does not ship
+LBP_CASCADE_FILE = 'lbpcascade_frontalface_improved.xml'
+DNN_CONFIG_FILE = 'deploy.prototxt'
+DNN_WEIGHTS_FILE = 'res10_300x300_ssd_iter_140000.caffemodel'
+
+
+class FaceDetector(ABC):
+    """Finds face boxes, in full-frame pixels, on a frame scaled down by `scale`"""
+    name = ''
+    # Backends that also search small gray windows around previous faces
+    # (CascadeDetector.detect_window) set this
+    supports_windows = False
+
+    def __init__(self):
+        self.available = True
+
+    @abstractmethod
+    def detect(self, context: FrameContext, scale: float) -> List[Box]:
+        ...
+
+
+class CascadeDetector(FaceDetector):
+    """OpenCV cascade classifier (Haar or LBP) run on the downscaled gray frame"""
+    supports_windows = True
+
+    def __init__(self, name: str, path: str):
+        super().__init__()
+        self.name = name
+        self.cascade = cv2.CascadeClassifier(path) if os.path.exists(path) else None
+        self.available = self.cascade is not None and not self.cascade.empty()
+
+    def detect(self, context: FrameContext, scale: float) -> List[Box]:
+        found = self.cascade.detectMultiScale(
+            context.scaled_gray(scale), scaleFactor=1.1, minNeighbors=5, minSize=(30, 30)
+        )
+        return [tuple(int(round(v / scale)) for v in face) for face in found]
+
+    def detect_window(self, gray: np.ndarray, min_size: int, max_size: int) -> Sequence[Box]:
+        return self.cascade.detectMultiScale(
+            gray, scaleFactor=1.1, minNeighbors=5,
+            minSize=(min_size, min_size), maxSize=(max_size, max_size)
+        )
+
+
+class DnnDetector(FaceDetector):
+    """ResNet-10 SSD face detector (Caffe model) through cv2.dnn, always run at 300x300"""
+    name = 'dnn'
+
+    def __init__(self, config_path: str, weights_path: str, min_confidence: float = 0.5):
+        super().__init__()
+        self.min_confidence = min_confidence
+        self.net = None
+        self.available = os.path.exists(config_path) and os.path.exists(weights_path)
+        if self.available:
+            self.net = cv2.dnn.readNetFromCaffe(config_path, weights_path)
+
+    def detect(self, context: FrameContext, scale: float) -> List[Box]:
+        h, w = context.frame.shape[:2]
+        blob = cv2.dnn.blobFromImage(cv2.resize(context.frame, (300, 300), interpolation=cv2.INTER_AREA),
+                                     1.0, (300, 300), (104.0, 177.0, 123.0))
+        self.net.setInput(blob)
+        detections = self.net.forward()[0, 0]
+        faces = []
+        for confidence, x0, y0, x1, y1 in detections[:, 2:7]:
+            if confidence < self.min_confidence:
+                continue
+            x0, y0 = max(0, int(x0 * w)), max(0, int(y0 * h))
+            x1, y1 = min(w, int(x1 * w)), min(h, int(y1 * h))
+            if x1 > x0 and y1 > y0:
+                faces.append((x0, y0, x1 - x0, y1 - y0))
+        return faces
+
+
+class MediaPipeDetector(FaceDetector):
+    """MediaPipe FaceDetection, short-range model, created on first use"""
+    name = 'mediapipe'
+
+    def __init__(self, min_confidence: float = 0.5):
+        super().__init__()
+        self.min_confidence = min_confidence
+        self.face_detection = None
+        self.available = MEDIAPIPE_AVAILABLE
+
+    def detect(self, context: FrameContext, scale: float) -> List[Box]:
+        if self.face_detection is None:
+            self.face_detection = mp.solutions.face_detection.FaceDetection(
+                model_selection=0, min_detection_confidence=self.min_confidence
+            )
+        h, w = context.frame.shape[:2]
+        # Boxes come back normalized, so the downscaled frame needs no coordinate mapping
+        results = self.face_detection.process(context.scaled_rgb(scale))
+        faces = []
+        for detection in results.detections or []:
+            box = detection.location_data.relative_bounding_box
+            x0, y0 = max(0, int(box.xmin * w)), max(0, int(box.ymin * h))
+            x1, y1 = min(w, int((box.xmin + box.width) * w)), min(h, int((box.ymin + box.height) * h))
+            if x1 > x0 and y1 > y0:
+                faces.append((x0, y0, x1 - x0, y1 - y0))
+        return faces
+
+
+DETECTOR_NAMES = ('haar', 'lbp', 'dnn', 'mediapipe')
+
+
+def create_detector(name: str, model_dir: str = MODEL_DIR) -> FaceDetector:
+    """Build a detector backend by name; check `available` before using it"""
+    if name == 'haar':
+        return CascadeDetector('haar', cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    if name == 'lbp':
+        return CascadeDetector('lbp', os.path.join(model_dir, LBP_CASCADE_FILE))
+    if name == 'dnn':
+        return DnnDetector(os.path.join(model_dir, DNN_CONFIG_FILE), os.path.join(model_dir, DNN_WEIGHTS_FILE))
+    if name == 'mediapipe':
+        return MediaPipeDetector()
+    raise ValueError(f"Unknown face detector: {name}")
+
+
+class BenchmarkResult(NamedTuple):
+    """Speed of one detector on the test set, and its recall and precision against the reference boxes"""
+    name: str
+    available: bool
+    ms_per_frame: float
+    recall: float
+    precision: float
+
+
+def load_test_set(path: str = TEST_SET_PATH) -> List[Tuple[np.ndarray, List[Box]]]:
+    """
+    Frames and their reference face boxes; the frames are read from the video the test set
+    names. The bundled boxes are the Haar cascade's own output, so scores measure agreement
+    with Haar rather than accuracy, and Haar itself scores about 1.0
+    """
+    with open(path, 'r') as f:
+        test_set = json.load(f)
+    wanted = {entry['frame']: [tuple(face) for face in entry['faces']] for entry in test_set['frames']}
+    cap = cv2.VideoCapture(os.path.join(os.path.dirname(os.path.abspath(path)), test_set['video']))
+    samples = []
+    index = 0
+    # Read sequentially: frame seeking is not exact for every codec
+    while len(samples) < len(wanted):
+        ok, frame = cap.read()
+        if not ok:
+            break
+        if index in wanted:
+            samples.append((frame, wanted[index]))
+        index += 1
+    cap.release()
+    return samples
+
+
+def box_iou(a: Box, b: Box) -> float:
+    x0, y0 = max(a[0], b[0]), max(a[1], b[1])
+    x1, y1 = min(a[0] + a[2], b[0] + b[2]), min(a[1] + a[3], b[1] + b[3])
+    overlap = max(0, x1 - x0) * max(0, y1 - y0)
+    union = a[2] * a[3] + b[2] * b[3] - overlap
+    return overlap / union if union else 0.0
+
+
+def benchmark_detector(detector: FaceDetector, samples: List[Tuple[np.ndarray, List[Box]]],
+                       get_scale: Callable[[int], float], repeats: int = 1, min_iou: float = 0.4) -> BenchmarkResult:
+    """Time a detector over the samples and score its boxes against the reference boxes"""
+    if not detector.available or not samples:
+        return BenchmarkResult(detector.name, False, float('inf'), 0.0, 0.0)
+    # Warm-up, so model loading and first-call allocations are not timed
+    detector.detect(FrameContext(samples[0][0]), get_scale(samples[0][0].shape[0]))
+
+    found = []
+    start = time.perf_counter()
+    for _ in range(repeats):
+        found = [detector.detect(FrameContext(frame), get_scale(frame.shape[0])) for frame, _ in samples]
+    ms_per_frame = (time.perf_counter() - start) * 1000 / (repeats * len(samples))
+
+    annotated = sum(len(faces) for _, faces in samples)
+    detected = sum(len(faces) for faces in found)
+    matched = sum(1 for (_, faces), boxes in zip(samples, found)
+                  for face in faces if any(box_iou(face, box) >= min_iou for box in boxes))
+    correct = sum(1 for (_, faces), boxes in zip(samples, found)
+                  for box in boxes if any(box_iou(face, box) >= min_iou for face in faces))
+    return BenchmarkResult(detector.name, True, ms_per_frame,
+                           matched / annotated if annotated else 0.0,
+                           correct / detected if detected else 0.0)
+
+
+def benchmark_detectors(get_scale: Callable[[int], float], names: Sequence[str] = DETECTOR_NAMES,
+                        test_set_path: str = TEST_SET_PATH, model_dir: str = MODEL_DIR) -> List[BenchmarkResult]:
+    samples = load_test_set(test_set_path)
+    return [benchmark_detector(create_detector(name, model_dir), samples, get_scale) for name in names]
+
+
+def choose_detector(results: List[BenchmarkResult], min_recall: float = 0.9,
+                    min_precision: float = 0.8) -> Optional[str]:
+    """
+    The fastest available detector that meets both thresholds against the reference boxes,
+    if any. With the bundled Haar baseline this favours detectors whose boxes match Haar's
+    """
+    accurate = [r for r in results if r.available and r.recall >= min_recall and r.precision >= min_precision]
+    return min(accurate, key=lambda r: r.ms_per_frame).name if accurate else None
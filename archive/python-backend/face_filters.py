@@ -1,64 +1,163 @@
 import cv2
 import numpy as np
 import pyvirtualcam
-from typing import Tuple, Optional, List
+from typing import Callable, Tuple, Optional, List, NamedTuple
 import argparse
 import sys
 import os
 import time
 import json
-try:
-    import mediapipe as mp
-    MEDIAPIPE_AVAILABLE = True
-except ImportError:
-    MEDIAPIPE_AVAILABLE = False
+import color_luts
+import compositing
+from cache_manager import CacheManager, content_hash, get_cache_manager
+from face_tracker import FaceTracker
+from detection_worker import DetectionResult, DetectionWorker
+from frame_context import FrameContext
+from face_landmarks import LandmarkDetector
+from mask_assets import MaskAsset, get_mask_assets
+from mask_index import DEFAULT_EYE_ANCHOR, MaskEntry
+import face_detectors
+
+# Color op chains compiled by color_luts.compile_pipeline
+CYBERPUNK_PIPELINE = (color_luts.hue_rotate_op(120), color_luts.value_gain_op(1.3))
+SEPIA_PIPELINE = (color_luts.matrix_op(color_luts.SEPIA_MATRIX),)
+
+
+class PolarGrid(NamedTuple):
+    """Read-only float32 polar coordinate planes of a frame around a center point."""
+    dx: np.ndarray
+    dy: np.ndarray
+    dist: np.ndarray
+    angle: np.ndarray
+    cos: np.ndarray
+    sin: np.ndarray
 
 
 class FaceFilter:
-    def __init__(self, width: int = 1280, height: int = 720, fps: int = 30):
+    # Geometric filters that are not map-based but can be replayed on a coordinate map
+    COMPOSABLE_AFFINE_WARPS = ('skew_horizontal', 'skew_vertical', 'zoom_in', 'zoom_out', 'rotate', 'rotate_45',
+                               'rotate_90', 'flip_horizontal', 'flip_vertical', 'flip_both')
+    # Composite distortion of the scene's fx list, compiled into one map by apply_warp_chain
+    ULTIMATE_DISTORTION_CHAIN = ('wave', 'ripple', 'bulge')
+    
+    def __init__(self, width: int = 1280, height: int = 720, fps: int = 30, warp_cache_size: int = 24,
+                 fixed_point_maps: bool = True, anim_keyframes: int = 15, anim_cache_mb: int = 192,
+                 anim_blend: bool = False, map_scale: int = 1, cache_manager: Optional[CacheManager] = None,
+                 detect_interval: int = 10, detect_scale: Optional[float] = None, min_face_fraction: float = 0.08,
+                 async_detection: bool = True, landmark_width: int = 480, landmark_rate: float = 15.0,
+                 landmark_faces: int = 4, face_detector: str = 'auto', mask_placement: str = 'auto',
+                 streaming: bool = False):
         self.width = width
         self.height = height
         self.fps = fps
         self.cap = None
-        self.face_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-        )
-        # Initialize MediaPipe for facial landmarks
-        if MEDIAPIPE_AVAILABLE:
-            self.mp_face_mesh = mp.solutions.face_mesh
-            self.face_mesh = self.mp_face_mesh.FaceMesh(
-                static_image_mode=False,
-                max_num_faces=1,
-                refine_landmarks=True,
-                min_detection_confidence=0.5,
-                min_tracking_confidence=0.5
-            )
-        else:
-            self.face_mesh = None
         self.config_path = os.path.join(os.path.dirname(__file__), 'config.json')
+        # Haar runs on a downscaled gray frame: a fixed detect_scale, or None to derive it from
+        # the frame height so the smallest face wanted (min_face_fraction of it) stays 30 px
+        self.detect_scale = detect_scale
+        self.min_face_fraction = min_face_fraction
+        # Detector backend by name (see face_detectors), or 'auto' for the one saved by the detector benchmark
+        self.face_detector = self.select_face_detector(face_detector)
+        # Re-detect inside windows around the last faces first; full-frame search on a miss
+        # and every roi_full_interval calls so new faces are still picked up
+        self.last_faces = []
+        self.last_faces_shape = None
+        self.roi_full_interval = 15
+        self.roi_calls_since_full = 0
+        self.roi_stats = {'hits': 0, 'misses': 0, 'full_searches': 0, 'memo_hits': 0}
+        # Full Haar detection every detect_interval frames, template tracking in between
+        self.face_tracker = FaceTracker(self.detect_face, detect_interval=detect_interval)
+        # With a camera open, detection runs on a background thread and filters use its latest result
+        self.async_detection = async_detection
+        self.detection_worker = None
+        # Longest a filter waits for the worker's first usable result, in seconds
+        self.detection_timeout = 2.0
+        # Derived images (gray, HSV, edges, pyramids) of the frame being processed
+        self.frame_context: Optional[FrameContext] = None
+        self.frames_seen = 0
+        # Derived data lives in namespaces of the process-wide cache manager, shared by every instance
+        self.cache_manager = cache_manager or get_cache_manager()
+        # Face boxes and landmarks keyed by a hash of the detector's input image, so still
+        # images pushed through many filters (batch tools) are only detected once
+        self.detection_memo = self.cache_manager.namespace('detections', max_entries=64)
+        # MediaPipe landmarks for up to landmark_faces faces: model loaded on first use, run on a frame
+        # at most landmark_width wide. With streaming (frames of one live video) FaceMesh runs at most
+        # landmark_rate times per second (0 for every frame), smoothed in between; otherwise every call
+        self.landmark_detector = LandmarkDetector(max_width=landmark_width, max_faces=landmark_faces,
+                                                  min_interval=1.0 / landmark_rate if landmark_rate > 0 else 0.0,
+                                                  memo=self.detection_memo, streaming=streaming)
+        # Tilted face masks are placed with one affine warp ('warp'), or rotated through inverse
+        # maps cached per mask size and mask_angle_step-degree angle ('remap'); 'auto' remaps
+        # masks covering at most remap_max_fraction of the frame
+        self.mask_placement = mask_placement
+        self.mask_angle_step = 1.0
+        self.remap_max_fraction = 0.05
+        self.rotation_maps = self.cache_manager.namespace('mask_rotation_maps', max_entries=64)
+        self.mask_scratch = compositing.Scratch()
         self.camera_index = self.load_camera_index()
         self.sam_drops = []
         self.last_spawn_time = 0
-    
-    def load_camera_index(self) -> Optional[int]:
+        # Remap maps for static warps, keyed by (filter, width, height, settings, params)
+        self.warp_cache = self.cache_manager.namespace('warp_maps', max_entries=warp_cache_size)
+        self.chain_cache = self.cache_manager.namespace('warp_chains', max_entries=warp_cache_size)
+        # Compile cached maps to CV_16SC2 + CV_16UC1 for faster remap; disable for bit-exact float output
+        self.fixed_point_maps = fixed_point_maps
+        # Shared dx/dy/dist/angle planes per (width, height, center) for radial filters
+        self.polar_grids = self.cache_manager.namespace('polar_grids', max_entries=4)
+        # Keyframe maps for periodic animated warps, keyed by (filter, width, height, keyframe)
+        self.anim_cache_budget = anim_cache_mb * 1024 * 1024
+        self.anim_cache = self.cache_manager.namespace('anim_keyframes', quota_bytes=self.anim_cache_budget)
+        self.anim_keyframes = anim_keyframes
+        # Blend the two neighbouring keyframes instead of snapping to the nearest one
+        self.anim_blend = anim_blend
+        # Evaluate warp maps on a 1/map_scale sample grid and upsample them bilinearly
+        self.map_scale = map_scale
+        self.map_build_scale = 1
+    
+    def load_config(self) -> dict:
         if os.path.exists(self.config_path):
             try:
                 with open(self.config_path, 'r') as f:
-                    config = json.load(f)
-                    camera_index = config.get('camera_index')
-                    if camera_index is not None:
-                        return int(camera_index)
-            except (json.JSONDecodeError, ValueError, KeyError):
+                    return json.load(f)
+            except (json.JSONDecodeError, ValueError):
                 pass
+        return {}
+    
+    def update_config(self, **values):
+        """Write settings to config.json, keeping the ones already saved."""
+        config = self.load_config()
+        config.update(values)
+        with open(self.config_path, 'w') as f:
+            json.dump(config, f, indent=2)
+    
+    def load_camera_index(self) -> Optional[int]:
+        try:
+            camera_index = self.load_config().get('camera_index')
+            if camera_index is not None:
+                return int(camera_index)
+        except (ValueError, TypeError):
+            pass
         return None
     
     def save_camera_index(self, camera_index: int):
-        config = {'camera_index': camera_index}
         try:
-            with open(self.config_path, 'w') as f:
-                json.dump(config, f, indent=2)
+            self.update_config(camera_index=camera_index)
         except Exception as e:
             print(f"Warning: Could not save camera index to config: {e}")
+    
+    def select_face_detector(self, name: str) -> face_detectors.FaceDetector:
+        """
+        Create the named detector backend. 'auto' uses the backend saved by
+        scripts-backend/benchmark_detectors.py --save, or Haar if none was saved. Falls back
+        to Haar if the chosen backend's model or library is missing.
+        """
+        if name == 'auto':
+            name = self.load_config().get('face_detector') or 'haar'
+        detector = face_detectors.create_detector(name)
+        if not detector.available:
+            print(f"Warning: Face detector '{name}' is not available, using Haar cascade")
+            detector = face_detectors.create_detector('haar')
+        return detector
         
     def __enter__(self):
         camera_indices_to_try = []
@@ -79,6 +178,8 @@ class FaceFilter:
                 if ret and test_frame is not None:
                     if idx != self.camera_index:
                         self.save_camera_index(idx)
+                    if self.async_detection:
+                        self.start_detection_worker()
                     return self
                 else:
                     self.cap.release()
@@ -89,184 +190,483 @@ class FaceFilter:
         raise RuntimeError("Could not open camera")
         
     def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop_detection_worker()
         if self.cap:
             self.cap.release()
+    
+    def start_detection_worker(self):
+        if self.detection_worker is None:
+            self.detection_worker = DetectionWorker(self.detect_all_faces, self.detect_all_facial_landmarks)
+            self.detection_worker.start()
+    
+    def stop_detection_worker(self):
+        if self.detection_worker is not None:
+            self.detection_worker.stop()
+            self.detection_worker = None
             
+    def begin_frame(self, frame: np.ndarray) -> FrameContext:
+        """Start a new captured frame; detection and filters then share its derived images."""
+        self.frames_seen += 1
+        self.frame_context = FrameContext(frame, self.frames_seen)
+        return self.frame_context
+    
+    def context_for(self, frame: np.ndarray) -> FrameContext:
+        """The context of the current frame, or a new one if a different image is passed in."""
+        context = self.frame_context
+        if context is None or context.frame is not frame:
+            context = self.begin_frame(frame)
+        return context
+    
+    def get_detection_scale(self, height: int) -> float:
+        if self.detect_scale is not None:
+            return self.detect_scale
+        return min(1.0, 30.0 / (self.min_face_fraction * height))
+    
+    def detect_faces_scaled(self, frame: np.ndarray, context: Optional[FrameContext] = None) -> List[Tuple[int, int, int, int]]:
+        """
+        Run the face detector on a downscaled copy of the frame and map the boxes
+        back to full resolution. With the automatic scale the detection image is about
+        the same size for 480p and 4K input, so detection time stays roughly constant.
+        """
+        context = context or self.context_for(frame)
+        scale = min(1.0, self.get_detection_scale(frame.shape[0]))
+        memo_key = ('faces', self.face_detector.name, scale, context.frame.shape[:2],
+                    content_hash(context.scaled_gray(scale)))
+        faces = self.detection_memo.get(memo_key)
+        if faces is not None:
+            self.roi_stats['memo_hits'] += 1
+            self.last_faces = list(faces)
+            self.last_faces_shape = frame.shape[:2]
+            return list(faces)
+        
+        faces = None
+        if (self.face_detector.supports_windows and self.last_faces and self.last_faces_shape == frame.shape[:2]
+                and self.roi_calls_since_full < self.roi_full_interval):
+            faces = self.detect_faces_in_rois(context.scaled_gray(scale), scale)
+            self.roi_stats['hits' if faces is not None else 'misses'] += 1
+        if faces is None:
+            faces = self.face_detector.detect(context, scale)
+            self.roi_stats['full_searches'] += 1
+            self.roi_calls_since_full = 0
+        else:
+            self.roi_calls_since_full += 1
+        
+        self.last_faces = faces
+        self.last_faces_shape = frame.shape[:2]
+        self.detection_memo.put(memo_key, tuple(faces))
+        return faces
+    
+    def detect_faces_in_rois(self, gray: np.ndarray, scale: float) -> Optional[List[Tuple[int, int, int, int]]]:
+        """
+        Look for each previous face in a window of 1.5x its size around it, only at
+        sizes within 0.7-1.4x of it. Returns None if any of them is not found again.
+        """
+        h_gray, w_gray = gray.shape[:2]
+        faces = []
+        for face in self.last_faces:
+            x, y, w, h = (v * scale for v in face)
+            x0, y0 = max(0, int(x - w * 0.5)), max(0, int(y - h * 0.5))
+            x1, y1 = min(w_gray, int(x + w * 1.5)), min(h_gray, int(y + h * 1.5))
+            min_size = max(30, int(w * 0.7))
+            max_size = int(w * 1.4) + 1
+            if x1 - x0 < min_size or y1 - y0 < min_size:
+                return None
+            found = self.face_detector.detect_window(gray[y0:y1, x0:x1], min_size, max_size)
+            if len(found) == 0:
+                return None
+            # Keep the candidate closest to where the face was
+            fx, fy, fw, fh = min(found, key=lambda f: abs(x0 + f[0] - x) + abs(y0 + f[1] - y))
+            faces.append(tuple(int(round(v / scale)) for v in (x0 + fx, y0 + fy, fw, fh)))
+        return faces
+    
+    def get_detection_stats(self) -> dict:
+        """ROI re-detection hit/miss counts and tracker detection/tracking counts."""
+        return dict(self.roi_stats,
+                    tracker_detections=self.face_tracker.detections,
+                    tracked_frames=self.face_tracker.tracked_frames)
+    
     def detect_face(self, frame: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(
-            gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30)
-        )
+        faces = self.detect_faces_scaled(frame)
         if len(faces) > 0:
-            x, y, w, h = faces[0]
-            return (x, y, w, h)
+            return faces[0]
         return None
     
-    def detect_all_faces(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(
-            gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30)
-        )
-        return [(x, y, w, h) for (x, y, w, h) in faces]
+    def track_face(self, frame: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Get the face box for the next frame of a video stream.
+        Runs detect_face every detect_interval frames (or when the match confidence
+        drops) and follows the box with a template match in between. With the
+        detection worker running, detection never blocks: the tracker re-seeds from
+        each result the worker publishes instead.
+        """
+        context = self.context_for(frame)
+        if self.detection_worker is None:
+            return self.face_tracker.update(frame, context.gray())
+        self.detection_worker.submit(frame, context)
+        return self.face_tracker.follow(frame, self.detection_worker.latest(), self.detection_worker.frame_index,
+                                        context.gray())
+    
+    def current_faces(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """All face boxes for a video frame: the worker's latest result, or a direct detection."""
+        if self.detection_worker is None:
+            return self.detect_all_faces(frame)
+        result = self.worker_result(frame, landmarks=False)
+        return result.faces if result else []
+    
+    def current_landmarks(self, frame: np.ndarray) -> List[dict]:
+        """Facial landmarks of every face in a video frame, from the worker once a filter has asked for them."""
+        if self.detection_worker is None:
+            return self.detect_all_facial_landmarks(frame)
+        result = self.worker_result(frame, landmarks=True)
+        return result.landmarks or [] if result else []
+    
+    def current_detections(self, frame: np.ndarray) -> Tuple[List[Tuple[int, int, int, int]], List[dict]]:
+        """Face boxes and landmarks of every face in a video frame, from one detection pass."""
+        if self.detection_worker is None:
+            context = self.context_for(frame)
+            return self.detect_all_faces(frame, context), self.detect_all_facial_landmarks(frame, context)
+        result = self.worker_result(frame, landmarks=True)
+        return (result.faces, result.landmarks or []) if result else ([], [])
+    
+    def worker_result(self, frame: np.ndarray, landmarks: bool) -> Optional[DetectionResult]:
+        """
+        Submit a frame to the detection worker and return its latest result. Detection only
+        ever runs on the worker thread: until it has published a usable result (first frames,
+        one-shot renders, landmarks just requested) this waits for it, up to detection_timeout.
+        The worker keeps running MediaPipe only while filters keep asking for landmarks.
+        """
+        index = self.detection_worker.submit(frame, self.context_for(frame), landmarks=landmarks)
+        result = self.detection_worker.latest()
+        if result is None or (landmarks and result.landmarks is None):
+            result = self.detection_worker.wait(index, self.detection_timeout, landmarks=landmarks)
+        return result
     
+    def detect_all_faces(self, frame: np.ndarray, context: Optional[FrameContext] = None) -> List[Tuple[int, int, int, int]]:
+        return self.detect_faces_scaled(frame, context)
+    
+    def get_warp_maps(self, name: str, width: int, height: int, **params) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the remap maps for a static warp filter, building them on first use.
+        The maps only depend on the frame size and the filter parameters, so they are
+        cached per (name, width, height, params) and every later frame just remaps.
         
-    def apply_bulge(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
+        With fixed_point_maps enabled the maps are compiled once with cv2.convertMaps
+        into the fixed-point CV_16SC2 + CV_16UC1 pair that cv2.remap handles fastest.
+        Otherwise the float32 (map_x, map_y) pair is returned unchanged.
+        """
+        cache = self.chain_cache if name == 'chain' else self.warp_cache
+        key = (name, width, height, self.fixed_point_maps, self.map_scale, tuple(sorted(params.items())))
+        maps = cache.get(key)
+        if maps is not None:
+            return maps
+        
+        # Chains compose full-size maps; their member warps honour map_scale in _build_chain_maps
+        scale = 1 if name == 'chain' else self.map_scale
+        maps = self.build_maps(getattr(self, f'_build_{name}_maps'), width, height, scale, **params)
+        if self.fixed_point_maps:
+            maps = cv2.convertMaps(maps[0], maps[1], cv2.CV_16SC2)
+        return cache.put(key, maps)
+    
+    def map_coords(self, width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Float32 x/y pixel coordinate planes that map builders evaluate their warp on.
+        At map_build_scale 1 this is every pixel; otherwise it is the pixel centres of a
+        1/scale grid, matching the sample positions cv2.resize uses to upsample it.
+        """
+        scale = self.map_build_scale
+        w_small = -(-width // scale)
+        h_small = -(-height // scale)
+        xs = (np.arange(w_small, dtype=np.float32) + 0.5) * (width / w_small) - 0.5
+        ys = (np.arange(h_small, dtype=np.float32) + 0.5) * (height / h_small) - 0.5
+        return np.meshgrid(xs, ys)
+    
+    def build_maps(self, builder, width: int, height: int, scale: int, *args, **params) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run a map builder, optionally on a 1/scale grid upsampled bilinearly to full size.
+        Warp maps are smooth, so this cuts build time and temporaries by scale^2;
+        measure_map_error reports what it costs per filter.
+        """
+        if scale == 1:
+            return builder(width, height, *args, **params)
+        previous_scale = self.map_build_scale
+        self.map_build_scale = scale
+        try:
+            map_x, map_y = builder(width, height, *args, **params)
+        finally:
+            self.map_build_scale = previous_scale
+        return (cv2.resize(map_x, (width, height), interpolation=cv2.INTER_LINEAR),
+                cv2.resize(map_y, (width, height), interpolation=cv2.INTER_LINEAR))
+    
+    def measure_map_error(self, name: str, width: int, height: int, scale: int) -> float:
+        """Max pixel error of a warp's upsampled 1/scale maps against its full-size maps."""
+        builder = getattr(self, f'_build_{name}_maps')
+        full_x, full_y = self.build_maps(builder, width, height, 1)
+        low_x, low_y = self.build_maps(builder, width, height, scale)
+        return float(max(np.abs(full_x - low_x).max(), np.abs(full_y - low_y).max()))
+    
+    def get_polar_grid(self, width: int, height: int, center_x: float, center_y: float) -> PolarGrid:
+        """
+        Get the shared polar coordinate grid for a frame size and center point.
+        Radial filters read dx/dy/dist/angle/cos/sin from here instead of running
+        sqrt/arctan2/cos/sin over the whole frame themselves. The planes are float32
+        and read-only, so callers must derive new arrays rather than edit them.
+        """
+        key = (width, height, center_x, center_y, self.map_build_scale)
+        grid = self.polar_grids.get(key)
+        if grid is not None:
+            return grid
+        
+        dx, dy = self.map_coords(width, height)
+        dx -= center_x
+        dy -= center_y
+        dist = np.sqrt(dx * dx + dy * dy)
+        angle = np.arctan2(dy, dx)
+        grid = PolarGrid(dx, dy, dist, angle, np.cos(angle), np.sin(angle))
+        for plane in grid:
+            plane.setflags(write=False)
+        return self.polar_grids.put(key, grid)
+    
+    def get_keyframe_count(self, width: int, height: int) -> int:
+        """
+        Keyframes per period (anim_keyframes), or 0 if a full period of maps at this frame
+        size does not fit the animated map budget. Fewer keyframes would visibly stutter.
+        """
+        map_bytes = width * height * (4 + 2 if self.fixed_point_maps and not self.anim_blend else 8)
+        return self.anim_keyframes if self.anim_keyframes * map_bytes <= self.anim_cache_budget else 0
+    
+    def get_keyframe_maps(self, name: str, width: int, height: int, index: int,
+                          keyframes: int, fixed_point: bool) -> Tuple[np.ndarray, np.ndarray]:
+        key = (name, width, height, index, keyframes, fixed_point, self.map_scale)
+        maps = self.anim_cache.get(key)
+        if maps is not None:
+            return maps
+        
+        builder = getattr(self, f'_build_{name}_keyframe')
+        maps = self.build_maps(builder, width, height, self.map_scale, index / keyframes)
+        if fixed_point:
+            maps = cv2.convertMaps(maps[0], maps[1], cv2.CV_16SC2)
+        return self.anim_cache.put(key, maps)
+    
+    def apply_animated_warp(self, frame: np.ndarray, name: str, phase: float) -> np.ndarray:
+        """
+        Remap a frame for a periodic animated warp at a phase in [0, 1).
+        The period is split into keyframes whose maps are built once by
+        _build_{name}_keyframe(width, height, phase) and cached within anim_cache_mb,
+        so a looping animation turns into lookups instead of a trig pass per frame.
+        The nearest keyframe is used, or with anim_blend the two neighbouring float
+        maps are linearly blended. Frame sizes whose keyframes do not fit the budget
+        build the maps for the exact phase every frame, uncached.
+        """
+        h_frame, w_frame = frame.shape[:2]
+        keyframes = self.get_keyframe_count(w_frame, h_frame)
+        if keyframes == 0:
+            builder = getattr(self, f'_build_{name}_keyframe')
+            map_x, map_y = self.build_maps(builder, w_frame, h_frame, self.map_scale, phase % 1.0)
+            return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        position = (phase % 1.0) * keyframes
+        if not self.anim_blend:
+            index = int(round(position)) % keyframes
+            map1, map2 = self.get_keyframe_maps(name, w_frame, h_frame, index, keyframes, self.fixed_point_maps)
+            return cv2.remap(frame, map1, map2, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        
+        index = int(position)
+        t = position - index
+        map_x, map_y = self.get_keyframe_maps(name, w_frame, h_frame, index % keyframes, keyframes, False)
+        if t > 1e-3:
+            next_x, next_y = self.get_keyframe_maps(name, w_frame, h_frame, (index + 1) % keyframes, keyframes, False)
+            map_x = cv2.addWeighted(map_x, 1 - t, next_x, t, 0)
+            map_y = cv2.addWeighted(map_y, 1 - t, next_y, t, 0)
+        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+    
+    def warp_affine(self, frame: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+        """
+        Warp a frame with a 2x3 matrix mapping output pixels to source pixels.
+        Zoom, rotate, skew, stretch and shake filters go through here, so they cost one
+        cv2.warpAffine pass with no per-pixel map allocation, even when animated.
+        """
+        h_frame, w_frame = frame.shape[:2]
+        return cv2.warpAffine(frame, matrix, (w_frame, h_frame),
+                              flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP,
+                              borderMode=cv2.BORDER_REPLICATE)
+    
+    def zoom_matrix(self, frame: np.ndarray, zoom_factor: float) -> np.ndarray:
         h_frame, w_frame = frame.shape[:2]
         center_x = w_frame // 2
         center_y = h_frame // 2
-        radius = min(w_frame, h_frame) // 2
+        scale = 1.0 / zoom_factor
+        return np.float32([[scale, 0, center_x * (1 - scale)],
+                           [0, scale, center_y * (1 - scale)]])
+    
+    def rotation_matrix(self, frame: np.ndarray, rotation_angle: float) -> np.ndarray:
+        h_frame, w_frame = frame.shape[:2]
+        center_x = w_frame // 2
+        center_y = h_frame // 2
+        cos_a = np.cos(rotation_angle)
+        sin_a = np.sin(rotation_angle)
+        return np.float32([[cos_a, -sin_a, center_x - center_x * cos_a + center_y * sin_a],
+                           [sin_a, cos_a, center_y - center_x * sin_a - center_y * cos_a]])
+    
+    def apply_cached_warp(self, frame: np.ndarray, name: str, **params) -> np.ndarray:
+        h_frame, w_frame = frame.shape[:2]
+        map1, map2 = self.get_warp_maps(name, w_frame, h_frame, **params)
+        return cv2.remap(frame, map1, map2, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+    
+    def apply_warp_chain(self, frame: np.ndarray, chain: Tuple[str, ...]) -> np.ndarray:
+        """
+        Apply a sequence of geometric filters, first to last, with a single remap.
+        The chain is compiled once per frame size into one composed map, so K warps
+        cost one cv2.remap and the image is only resampled once.
+        """
+        return self.apply_cached_warp(frame, 'chain', chain=tuple(chain))
+    
+    def _build_chain_maps(self, w_frame: int, h_frame: int, chain: Tuple[str, ...]) -> Tuple[np.ndarray, np.ndarray]:
+        # Push an identity coordinate map through every warp: remapping a map by a
+        # later warp's map yields the composed map (source = first(second(output)))
+        coords = np.dstack(np.meshgrid(np.arange(w_frame, dtype=np.float32),
+                                       np.arange(h_frame, dtype=np.float32)))
+        for name in chain:
+            builder = getattr(self, f'_build_{name}_maps', None)
+            if builder is not None and name not in ('zoom_blur', 'radial_blur', 'chain'):
+                map_x, map_y = self.build_maps(builder, w_frame, h_frame, self.map_scale)
+                coords = cv2.remap(coords, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+            elif name in self.COMPOSABLE_AFFINE_WARPS:
+                coords = getattr(self, f'apply_{name}')(coords, None)
+            else:
+                raise ValueError(f"Filter '{name}' is not a composable static warp")
+        map_x, map_y = cv2.split(coords)
+        return map_x, map_y
+    
+    def apply_ultimate_distortion(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
+        return self.apply_warp_chain(frame, self.ULTIMATE_DISTORTION_CHAIN)
         
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist_sq = dx * dx + dy * dy
-        max_dist_sq = radius * radius
+    def apply_bulge(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
+        return self.apply_cached_warp(frame, 'bulge')
+    
+    def _build_bulge_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
+        center_x = w_frame // 2
+        center_y = h_frame // 2
+        radius = min(w_frame, h_frame) // 2
         
-        mask = dist_sq < max_dist_sq
-        dist = np.sqrt(np.maximum(dist_sq, 1))
+        grid = self.get_polar_grid(w_frame, h_frame, center_x, center_y)
+        dist = np.maximum(grid.dist, 1)
         
         strength = 0.5
         factor = 1.0 - (dist / radius) * strength
         factor = np.clip(factor, 0, 1)
         
-        new_x = center_x + dx * factor
-        new_y = center_y + dy * factor
+        new_x = center_x + grid.dx * factor
+        new_y = center_y + grid.dy * factor
         
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
         
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
         
     def apply_stretch(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
         x, y, w, h = face
         center_x = x + w // 2
         center_y = y + h // 2
         
-        result = frame.copy()
-        h_frame, w_frame = frame.shape[:2]
-        
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        
         stretch_x = 1.5
         stretch_y = 0.7
         
-        new_x = center_x + dx * stretch_x
-        new_y = center_y + dy * stretch_y
-        
-        map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
-        map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        
-        result = cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
-        return result
+        matrix = np.float32([[stretch_x, 0, center_x * (1 - stretch_x)],
+                             [0, stretch_y, center_y * (1 - stretch_y)]])
+        return self.warp_affine(frame, matrix)
         
     def apply_swirl(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        result = frame.copy()
-        h_frame, w_frame = frame.shape[:2]
+        return self.apply_cached_warp(frame, 'swirl')
+    
+    def _build_swirl_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_x = w_frame // 2
         center_y = h_frame // 2
         radius = min(w_frame, h_frame) // 2
         
-        y_coords, x_coords = np.ogrid[:h_frame, :w_frame]
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist = np.sqrt(dx * dx + dy * dy)
+        grid = self.get_polar_grid(w_frame, h_frame, center_x, center_y)
         
-        angle = np.arctan2(dy, dx)
         swirl_strength = 2.0
-        max_angle = swirl_strength * (1.0 - np.clip(dist / radius, 0, 1))
+        max_angle = swirl_strength * (1.0 - np.clip(grid.dist / radius, 0, 1))
         
-        new_angle = angle + max_angle
-        new_x = center_x + dist * np.cos(new_angle)
-        new_y = center_y + dist * np.sin(new_angle)
+        new_angle = grid.angle + max_angle
+        new_x = center_x + grid.dist * np.cos(new_angle)
+        new_y = center_y + grid.dist * np.sin(new_angle)
         
         new_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         new_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
         
-        mask = dist < radius
-        map_x, map_y = np.meshgrid(np.arange(w_frame), np.arange(h_frame))
-        map_x = map_x.astype(np.float32)
-        map_y = map_y.astype(np.float32)
+        mask = grid.dist < radius
+        map_x = grid.dx + center_x
+        map_y = grid.dy + center_y
         
         map_x[mask] = new_x[mask]
         map_y[mask] = new_y[mask]
         
-        result = cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
-        return result
+        return map_x, map_y
         
     def apply_fisheye(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        result = frame.copy()
-        h_frame, w_frame = frame.shape[:2]
+        return self.apply_cached_warp(frame, 'fisheye')
+    
+    def _build_fisheye_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_x = w_frame // 2
         center_y = h_frame // 2
         radius = min(w_frame, h_frame) // 2
         
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist = np.sqrt(dx * dx + dy * dy)
+        grid = self.get_polar_grid(w_frame, h_frame, center_x, center_y)
         
         max_dist = radius
-        normalized_dist = np.clip(dist / max_dist, 0, 1)
+        normalized_dist = np.clip(grid.dist / max_dist, 0, 1)
         
         fisheye_strength = 0.8
         new_dist = normalized_dist * (1.0 - fisheye_strength * normalized_dist * normalized_dist)
         new_dist = new_dist * max_dist
         
-        angle = np.arctan2(dy, dx)
-        new_x = center_x + new_dist * np.cos(angle)
-        new_y = center_y + new_dist * np.sin(angle)
+        new_x = center_x + new_dist * grid.cos
+        new_y = center_y + new_dist * grid.sin
         
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
         
-        result = cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
-        return result
+        return map_x, map_y
         
     def apply_pinch(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        result = frame.copy()
-        h_frame, w_frame = frame.shape[:2]
+        return self.apply_cached_warp(frame, 'pinch')
+    
+    def _build_pinch_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_x = w_frame // 2
         center_y = h_frame // 2
         radius = min(w_frame, h_frame) // 2
         
-        y_coords, x_coords = np.ogrid[:h_frame, :w_frame]
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist = np.sqrt(dx * dx + dy * dy)
+        grid = self.get_polar_grid(w_frame, h_frame, center_x, center_y)
         
         max_dist = radius
-        normalized_dist = np.clip(dist / max_dist, 0, 1)
+        normalized_dist = np.clip(grid.dist / max_dist, 0, 1)
         
         pinch_strength = 0.6
         new_dist = normalized_dist * (1.0 + pinch_strength * (1.0 - normalized_dist))
         new_dist = new_dist * max_dist
         
-        angle = np.arctan2(dy, dx)
-        new_x = center_x + new_dist * np.cos(angle)
-        new_y = center_y + new_dist * np.sin(angle)
+        new_x = center_x + new_dist * grid.cos
+        new_y = center_y + new_dist * grid.sin
         
         new_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         new_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
         
-        mask = dist < radius
-        map_x, map_y = np.meshgrid(np.arange(w_frame), np.arange(h_frame))
-        map_x = map_x.astype(np.float32)
-        map_y = map_y.astype(np.float32)
+        mask = grid.dist < radius
+        map_x = grid.dx + center_x
+        map_y = grid.dy + center_y
         
         map_x[mask] = new_x[mask]
         map_y[mask] = new_y[mask]
         
-        result = cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
-        return result
+        return map_x, map_y
         
     def apply_wave(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
+        return self.apply_cached_warp(frame, 'wave')
+    
+    def _build_wave_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_y = h_frame // 2
         
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
+        x_coords, y_coords = self.map_coords(w_frame, h_frame)
         
         wave_amplitude = 30.0
         wave_frequency = 0.05
@@ -278,7 +678,7 @@ class FaceFilter:
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
         
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
         
     def apply_mirror_split(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
         result = frame.copy()
@@ -293,97 +693,100 @@ class FaceFilter:
         
         return result
     
-    def detect_facial_landmarks(self, frame: np.ndarray) -> Optional[dict]:
+    def detect_facial_landmarks(self, frame: np.ndarray, context: Optional[FrameContext] = None) -> Optional[dict]:
         """
         Detect facial landmarks using MediaPipe for better face mask alignment.
-        Returns dict with eye positions, nose position, and face measurements.
+        Returns dict with eye positions, nose position, and face measurements of the first face.
         """
-        if not MEDIAPIPE_AVAILABLE or self.face_mesh is None:
-            return None
-        
-        # Convert BGR to RGB for MediaPipe
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.face_mesh.process(rgb_frame)
-        
-        if not results.multi_face_landmarks:
-            return None
-        
-        # Get the first face
-        face_landmarks = results.multi_face_landmarks[0]
-        h, w = frame.shape[:2]
-        
-        # MediaPipe landmark indices (468 landmarks for face mesh)
-        # Left eye: 33, 7, 163, 144, 145, 153, 154, 155, 133, 173, 157, 158, 159, 160, 161, 246
-        # Right eye: 362, 382, 381, 380, 374, 373, 390, 249, 263, 466, 388, 387, 386, 385, 384, 398
-        # Nose tip: 1, 2
-        # Face outline: 10, 151, 9, 175, etc.
-        
-        # Key landmarks for sizing
-        left_eye_outer = face_landmarks.landmark[33]  # Left eye outer corner
-        right_eye_outer = face_landmarks.landmark[263]  # Right eye outer corner
-        nose_tip = face_landmarks.landmark[1]  # Nose tip
-        chin = face_landmarks.landmark[175]  # Chin
-        forehead = face_landmarks.landmark[10]  # Forehead center
-        
-        # Convert normalized coordinates to pixel coordinates
-        left_eye = (int(left_eye_outer.x * w), int(left_eye_outer.y * h))
-        right_eye = (int(right_eye_outer.x * w), int(right_eye_outer.y * h))
-        nose = (int(nose_tip.x * w), int(nose_tip.y * h))
-        chin_point = (int(chin.x * w), int(chin.y * h))
-        forehead_point = (int(forehead.x * w), int(forehead.y * h))
-        
-        # Calculate measurements
-        eye_distance = np.sqrt((right_eye[0] - left_eye[0])**2 + (right_eye[1] - left_eye[1])**2)
-        face_height = np.sqrt((chin_point[0] - forehead_point[0])**2 + (chin_point[1] - forehead_point[1])**2)
-        
-        # Calculate face center and angle
-        eye_center = ((left_eye[0] + right_eye[0]) // 2, (left_eye[1] + right_eye[1]) // 2)
-        face_angle = np.arctan2(right_eye[1] - left_eye[1], right_eye[0] - left_eye[0])
-        
-        return {
-            'left_eye': left_eye,
-            'right_eye': right_eye,
-            'nose': nose,
-            'chin': chin_point,
-            'forehead': forehead_point,
-            'eye_center': eye_center,
-            'eye_distance': eye_distance,
-            'face_height': face_height,
-            'face_angle': face_angle
-        }
+        landmarks = self.detect_all_facial_landmarks(frame, context)
+        return landmarks[0] if landmarks else None
     
-    def apply_face_mask_from_asset(self, frame: np.ndarray, face: Tuple[int, int, int, int], asset_name: str, debug_mode: bool = False, asset_dir: str = 'assets') -> np.ndarray:
+    def detect_all_facial_landmarks(self, frame: np.ndarray, context: Optional[FrameContext] = None) -> List[dict]:
         """
-        Apply a face mask from an asset file using facial landmarks for better sizing and alignment.
-        The asset should be in the assets/ folder or assets/dropout/ folder.
+        Landmark dicts (see detect_facial_landmarks) for every face FaceMesh finds.
+        Computed once per frame; see LandmarkDetector for the rate limit and smoothing.
+        """
+        context = context or self.context_for(frame)
+        return context.memo('landmarks', lambda: self.landmark_detector.detect(context))
+    
+    def load_mask_asset(self, asset_name: str, asset_dir: str = 'assets') -> Optional[MaskAsset]:
+        """Decoded face mask PNG from asset_dir, served from the shared asset cache."""
+        asset_path = os.path.join(os.path.dirname(__file__), asset_dir, f'{asset_name}.png')
+        return get_mask_assets().get(asset_path)
+    
+    def apply_face_masks(self, frame: np.ndarray, asset_name: str,
+                         faces: Optional[List[Tuple[int, int, int, int]]] = None,
+                         landmarks: Optional[List[dict]] = None, debug_mode: bool = False,
+                         asset_dir: str = 'assets') -> np.ndarray:
+        """
+        Apply a face mask from an asset file to every face in the frame in one pass.
+        Faces and landmarks come from a single detection pass unless given. Faces with
+        landmarks are placed by them, the other detected faces by their box. The frame
+        is copied once and each mask only blends over its own region.
         
         Args:
             frame: Input frame
-            face: Face coordinates (unused, kept for compatibility)
             asset_name: Name of the asset file (without extension, e.g., 'mask_name')
+            faces: Face boxes (default: current detections)
+            landmarks: Landmark dicts from detect_all_facial_landmarks (default: current detections)
             debug_mode: If True, use 50% opacity to help align eyes. Default: False
             asset_dir: Directory to load asset from ('assets' or 'assets/dropout'). Default: 'assets'
         
         Returns:
-            Frame with face mask applied
+            Frame with face masks applied
         """
-        result = frame.copy()
-        asset_path = os.path.join(os.path.dirname(__file__), asset_dir, f'{asset_name}.png')
-        
-        if not os.path.exists(asset_path):
-            print(f"Warning: Asset not found at {asset_path}")
-            return result
-        
-        asset_img = cv2.imread(asset_path, cv2.IMREAD_UNCHANGED)
-        if asset_img is None:
-            print(f"Warning: Failed to load asset image from {asset_path}")
-            return result
-        
-        print(f"Loaded asset: {asset_name}.png from {asset_dir} (size: {asset_img.shape})")
-        
-        # Try to get facial landmarks for better sizing
-        landmarks = self.detect_facial_landmarks(frame)
+        return self._apply_masks(frame, lambda: self.load_mask_asset(asset_name, asset_dir), faces, landmarks,
+                                 debug_mode, DEFAULT_EYE_ANCHOR)
+    
+    def apply_mask_entry(self, frame: np.ndarray, mask: MaskEntry,
+                         faces: Optional[List[Tuple[int, int, int, int]]] = None,
+                         landmarks: Optional[List[dict]] = None, debug_mode: bool = False) -> np.ndarray:
+        """apply_face_masks for a mask from the asset index: no name parsing or path building per frame."""
+        return self._apply_masks(frame, mask.load, faces, landmarks, debug_mode, mask.eye_anchor)
+    
+    def _apply_masks(self, frame: np.ndarray, load_asset: Callable[[], Optional[MaskAsset]],
+                     faces: Optional[List[Tuple[int, int, int, int]]], landmarks: Optional[List[dict]],
+                     debug_mode: bool, eye_anchor: Tuple[float, float]) -> np.ndarray:
+        if faces is None and landmarks is None:
+            faces, landmarks = self.current_detections(frame)
+        landmarks = landmarks or []
+        # Boxes already covered by a landmark set would get a second mask
+        boxes = [face for face in faces or []
+                 if not any(self._box_contains(face, face_landmarks['eye_center']) for face_landmarks in landmarks)]
+        if not landmarks and not boxes:
+            return frame
+        
+        asset = load_asset()
+        if asset is None:
+            return frame
         
+        result = frame.copy()
+        for face_landmarks in landmarks:
+            self._draw_face_mask(result, asset, face_landmarks, None, debug_mode, eye_anchor)
+        for face in boxes:
+            self._draw_face_mask(result, asset, None, face, debug_mode, eye_anchor)
+        return result
+    
+    def apply_face_mask_from_asset(self, frame: np.ndarray, face: Tuple[int, int, int, int], asset_name: str, debug_mode: bool = False, asset_dir: str = 'assets') -> np.ndarray:
+        """
+        Apply a face mask from an asset file to one face, using its facial landmarks for better
+        sizing and alignment when FaceMesh found them, else its box. Use apply_face_masks to
+        mask every face at once.
+        """
+        matched = [face_landmarks for face_landmarks in self.current_landmarks(frame)
+                   if self._box_contains(face, face_landmarks['eye_center'])]
+        return self.apply_face_masks(frame, asset_name, faces=[] if matched else [face], landmarks=matched[:1],
+                                     debug_mode=debug_mode, asset_dir=asset_dir)
+    
+    @staticmethod
+    def _box_contains(face: Tuple[int, int, int, int], point: Tuple[int, int]) -> bool:
+        x, y, w, h = face
+        return x <= point[0] < x + w and y <= point[1] < y + h
+    
+    def _draw_face_mask(self, result: np.ndarray, asset: MaskAsset, landmarks: Optional[dict],
+                        face: Optional[Tuple[int, int, int, int]], debug_mode: bool,
+                        eye_anchor: Tuple[float, float] = DEFAULT_EYE_ANCHOR):
+        """Size and rotate the mask for one face and blend it into result in place."""
         if landmarks:
             # Use landmarks for precise sizing
             eye_distance = landmarks['eye_distance']
@@ -408,7 +811,7 @@ class FaceFilter:
             mask_height = total_face_height * 1.35  # 35% larger for better coverage
             
             # Maintain aspect ratio of the asset
-            asset_aspect = asset_img.shape[1] / asset_img.shape[0]
+            asset_aspect = asset.bgr.shape[1] / asset.bgr.shape[0]
             mask_width_from_height = int(mask_height * asset_aspect)
             
             # Use the larger of eye-based width or height-based width
@@ -420,21 +823,16 @@ class FaceFilter:
                 mask_h = int(mask_height)
                 mask_w = int(mask_h * asset_aspect)
             
-            # Position mask: center horizontally on eye center
-            new_x = int(eye_center[0] - mask_w / 2)
+            # Position mask: put the asset's eye anchor (default: centered, ~35% from the top) on the eye center
+            new_x = int(eye_center[0] - mask_w * eye_anchor[0])
             
-            # Position vertically so eyes align - place eye center at ~35% from top of mask
             # Adjust upward by 40 pixels to better align eyes (user feedback)
             # This positions the mask higher so eyes match up properly
-            new_y = int(eye_center[1] - mask_h * 0.35 - 40)
+            new_y = int(eye_center[1] - mask_h * eye_anchor[1] - 40)
             
         else:
             # Fallback to bounding box method if landmarks not available
-            faces = self.detect_all_faces(frame)
-            if not faces:
-                return result
-            
-            x, y, w, h = faces[0]
+            x, y, w, h = face
             # Scale up the face mask to be significantly larger than detected face for better coverage
             scale_factor = 1.6  # Increased from 1.3 to 1.6 for better coverage
             mask_w = int(w * scale_factor)
@@ -448,8 +846,20 @@ class FaceFilter:
             new_x = max(0, x - offset_x)
             new_y = max(0, y - offset_y)
         
+        if landmarks and abs(landmarks['face_angle']) > 0.01:  # Only rotate if angle is significant
+            # Tilted faces: the mask is centred on the eye center and turned with the eye line
+            self._place_rotated_mask(result, asset, mask_w, mask_h, landmarks, debug_mode)
+            return
+        
+        # Snap to a cached, pre-scaled size bucket and keep the mask centred where it was placed
+        layer = get_mask_assets().scaled(asset, mask_w, mask_h)
+        scaled_h, scaled_w = layer.shape
+        new_x += (mask_w - scaled_w) // 2
+        new_y += (mask_h - scaled_h) // 2
+        mask_w, mask_h = scaled_w, scaled_h
+        
         # Ensure we don't go out of bounds
-        frame_h, frame_w = frame.shape[:2]
+        frame_h, frame_w = result.shape[:2]
         if new_x + mask_w > frame_w:
             new_x = frame_w - mask_w
         if new_y + mask_h > frame_h:
@@ -459,92 +869,58 @@ class FaceFilter:
         if new_y < 0:
             new_y = 0
         
-        # Resize asset to the calculated size
-        asset_resized = cv2.resize(asset_img, (mask_w, mask_h))
-        
-        # Rotate mask if face is tilted
-        if landmarks and abs(landmarks['face_angle']) > 0.01:  # Only rotate if angle is significant
-            # Calculate rotation angle in degrees (face_angle is in radians)
-            rotation_angle_deg = np.degrees(landmarks['face_angle'])
-            
-            # Calculate rotated dimensions to ensure full coverage
-            angle_rad = abs(landmarks['face_angle'])
-            rotated_w = int(mask_w * abs(np.cos(angle_rad)) + mask_h * abs(np.sin(angle_rad)))
-            rotated_h = int(mask_w * abs(np.sin(angle_rad)) + mask_h * abs(np.cos(angle_rad)))
-            
-            # Create rotation matrix centered on mask
-            rotation_center = (mask_w / 2, mask_h / 2)
-            rotation_matrix = cv2.getRotationMatrix2D(rotation_center, rotation_angle_deg, 1.0)
-            
-            # Adjust translation to keep mask centered after rotation
-            rotation_matrix[0, 2] += (rotated_w - mask_w) / 2
-            rotation_matrix[1, 2] += (rotated_h - mask_h) / 2
-            
-            # Apply rotation with transparent border
-            asset_resized = cv2.warpAffine(
-                asset_resized, 
-                rotation_matrix, 
-                (rotated_w, rotated_h), 
-                flags=cv2.INTER_LINEAR, 
-                borderMode=cv2.BORDER_TRANSPARENT
-            )
-            
-            # Update mask dimensions to rotated size
-            mask_w = rotated_w
-            mask_h = rotated_h
-            
-            # Recalculate position to keep mask centered on eye center
-            new_x = int(eye_center[0] - mask_w / 2)
-            new_y = int(eye_center[1] - mask_h / 2)
-        
-        # Extract the region of interest from the frame
-        roi = result[new_y:new_y+mask_h, new_x:new_x+mask_w]
-        
-        if asset_resized.shape[2] == 4:
-            alpha = asset_resized[:, :, 3:4] / 255.0
-            asset_bgr = asset_resized[:, :, :3]
-            
-            # Debug mode: use 50% opacity to help align eyes
+        # Debug mode: use 50% opacity to help align eyes
+        if debug_mode:
+            layer = compositing.fade(layer, 0.5)
+        compositing.composite(result, layer, new_x, new_y, self.mask_scratch)
+    
+    def _place_rotated_mask(self, result: np.ndarray, asset: MaskAsset, mask_w: int, mask_h: int,
+                            landmarks: dict, debug_mode: bool):
+        """Scale, rotate and translate the mask onto the eye center in a single resample."""
+        # Rotation angle in degrees (face_angle is in radians)
+        rotation_angle_deg = np.degrees(landmarks['face_angle'])
+        eye_center = landmarks['eye_center']
+        frame_h, frame_w = result.shape[:2]
+        
+        if self._remap_mask(mask_w, mask_h, frame_w, frame_h):
+            # Small masks: rotate a cached size bucket through inverse maps cached per quantized angle
+            layer = get_mask_assets().scaled(asset, mask_w, mask_h)
             if debug_mode:
-                alpha = alpha * 0.5  # Half opacity for debugging
-            
-            # Handle case where ROI might be smaller than mask (edge cases)
-            if roi.shape[:2] == (mask_h, mask_w):
-                blended = (alpha * asset_bgr + (1 - alpha) * roi).astype(np.uint8)
-                result[new_y:new_y+mask_h, new_x:new_x+mask_w] = blended
-            else:
-                # If ROI is smaller, crop the mask to match
-                crop_h, crop_w = roi.shape[:2]
-                mask_cropped = asset_resized[:crop_h, :crop_w]
-                if mask_cropped.shape[2] == 4:
-                    alpha_crop = mask_cropped[:, :, 3:4] / 255.0
-                    asset_bgr_crop = mask_cropped[:, :, :3]
-                    # Debug mode: use 50% opacity to help align eyes
-                    if debug_mode:
-                        alpha_crop = alpha_crop * 0.5  # Half opacity for debugging
-                    blended = (alpha_crop * asset_bgr_crop + (1 - alpha_crop) * roi).astype(np.uint8)
-                    result[new_y:new_y+crop_h, new_x:new_x+crop_w] = blended
-        else:
-            # Handle case where ROI might be smaller than mask
-            if roi.shape[:2] == (mask_h, mask_w):
-                result[new_y:new_y+mask_h, new_x:new_x+mask_w] = asset_resized
-            else:
-                crop_h, crop_w = roi.shape[:2]
-                result[new_y:new_y+crop_h, new_x:new_x+crop_w] = asset_resized[:crop_h, :crop_w]
-        
-        return result
+                layer = compositing.fade(layer, 0.5)
+            mask_h, mask_w = layer.shape
+            angle = round(rotation_angle_deg / self.mask_angle_step) * self.mask_angle_step
+            key = (mask_w, mask_h, angle)
+            maps = self.rotation_maps.get(key)
+            if maps is None:
+                maps = self.rotation_maps.put(key, compositing.rotation_maps(mask_w, mask_h, angle))
+            rotated_h, rotated_w = maps[0].shape[:2]
+            compositing.place_remapped(result, layer, maps, int(eye_center[0] - rotated_w / 2),
+                                       int(eye_center[1] - rotated_h / 2), self.mask_scratch)
+            return
+        
+        # One matrix from the nearest pyramid level: scale to mask size, rotate about the mask center,
+        # move that center onto the eye center
+        layer = get_mask_assets().level(asset, mask_w, mask_h)
+        if debug_mode:
+            layer = compositing.fade(layer, 0.5)
+        level_h, level_w = layer.shape
+        rotation = cv2.getRotationMatrix2D((0, 0), rotation_angle_deg, 1.0)[:, :2]
+        linear = rotation @ np.diag([mask_w / level_w, mask_h / level_h])
+        offset = np.array(eye_center, dtype=np.float64) - linear @ (level_w / 2, level_h / 2)
+        matrix = np.hstack([linear, offset[:, np.newaxis]])
+        compositing.place(result, layer, matrix, self.mask_scratch)
+    
+    def _remap_mask(self, mask_w: int, mask_h: int, frame_w: int, frame_h: int) -> bool:
+        if self.mask_placement == 'auto':
+            return mask_w * mask_h <= self.remap_max_fraction * frame_w * frame_h
+        return self.mask_placement == 'remap'
     
     def apply_black_white(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = self.context_for(frame).gray()
         return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
     
     def apply_sepia(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        result = frame.copy().astype(np.float32)
-        sepia_matrix = np.array([[0.272, 0.534, 0.131],
-                                [0.349, 0.686, 0.168],
-                                [0.393, 0.769, 0.189]])
-        result = cv2.transform(result, sepia_matrix)
-        return np.clip(result, 0, 255).astype(np.uint8)
+        return color_luts.compile_pipeline(SEPIA_PIPELINE).apply(frame)
     
     def apply_vintage(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
         result = self.apply_sepia(frame, face)
@@ -599,24 +975,21 @@ class FaceFilter:
         result = frame.copy()
         x, y, w, h = face
         roi = result[y:y+h, x:x+w]
-        roi[:,:,2] = np.clip(roi[:,:,2] * 1.5, 0, 255)
-        result[y:y+h, x:x+w] = roi
+        result[y:y+h, x:x+w] = color_luts.apply_lut(roi, color_luts.RED_TINT)
         return result
     
     def apply_blue_tint(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
         result = frame.copy()
         x, y, w, h = face
         roi = result[y:y+h, x:x+w]
-        roi[:,:,0] = np.clip(roi[:,:,0] * 1.5, 0, 255)
-        result[y:y+h, x:x+w] = roi
+        result[y:y+h, x:x+w] = color_luts.apply_lut(roi, color_luts.BLUE_TINT)
         return result
     
     def apply_green_tint(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
         result = frame.copy()
         x, y, w, h = face
         roi = result[y:y+h, x:x+w]
-        roi[:,:,1] = np.clip(roi[:,:,1] * 1.5, 0, 255)
-        result[y:y+h, x:x+w] = roi
+        result[y:y+h, x:x+w] = color_luts.apply_lut(roi, color_luts.GREEN_TINT)
         return result
     
     def apply_rainbow(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
@@ -633,23 +1006,21 @@ class FaceFilter:
         result = frame.copy()
         x, y, w, h = face
         roi = result[y:y+h, x:x+w]
-        negative = 255 - roi
-        result[y:y+h, x:x+w] = negative
+        result[y:y+h, x:x+w] = color_luts.apply_lut(roi, color_luts.NEGATIVE)
         return result
     
     def apply_posterize(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
         result = frame.copy()
         x, y, w, h = face
         roi = result[y:y+h, x:x+w]
-        roi = (roi // 32) * 32
-        result[y:y+h, x:x+w] = roi
+        result[y:y+h, x:x+w] = color_luts.apply_lut(roi, color_luts.POSTERIZE)
         return result
     
     def apply_sketch(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
         result = frame.copy()
         x, y, w, h = face
         roi = result[y:y+h, x:x+w]
-        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+        gray = self.context_for(frame).gray()[y:y+h, x:x+w]
         inverted = 255 - gray
         blurred = cv2.GaussianBlur(inverted, (21, 21), 0)
         sketch = cv2.divide(gray, 255 - blurred, scale=256)
@@ -661,8 +1032,7 @@ class FaceFilter:
         result = frame.copy()
         x, y, w, h = face
         roi = result[y:y+h, x:x+w]
-        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-        gray = cv2.medianBlur(gray, 5)
+        gray = cv2.medianBlur(self.context_for(frame).gray()[y:y+h, x:x+w], 5)
         edges = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY, 9, 9)
         color = cv2.bilateralFilter(roi, 9, 300, 300)
         cartoon = cv2.bitwise_and(color, color, mask=edges)
@@ -687,67 +1057,67 @@ class FaceFilter:
         return result
     
     def apply_thermal(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        return cv2.applyColorMap(gray, cv2.COLORMAP_HOT)
+        gray = self.context_for(frame).gray()
+        return color_luts.apply_colormap(gray, cv2.COLORMAP_HOT)
     
     def apply_ice(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        return cv2.applyColorMap(gray, cv2.COLORMAP_WINTER)
+        gray = self.context_for(frame).gray()
+        return color_luts.apply_colormap(gray, cv2.COLORMAP_WINTER)
     
     def apply_ocean(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        return cv2.applyColorMap(gray, cv2.COLORMAP_OCEAN)
+        gray = self.context_for(frame).gray()
+        return color_luts.apply_colormap(gray, cv2.COLORMAP_OCEAN)
     
     def apply_plasma(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        return cv2.applyColorMap(gray, cv2.COLORMAP_PLASMA)
+        gray = self.context_for(frame).gray()
+        return color_luts.apply_colormap(gray, cv2.COLORMAP_PLASMA)
     
     def apply_jet(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        return cv2.applyColorMap(gray, cv2.COLORMAP_JET)
+        gray = self.context_for(frame).gray()
+        return color_luts.apply_colormap(gray, cv2.COLORMAP_JET)
     
     def apply_turbo(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        return cv2.applyColorMap(gray, cv2.COLORMAP_TURBO)
+        gray = self.context_for(frame).gray()
+        return color_luts.apply_colormap(gray, cv2.COLORMAP_TURBO)
     
     def apply_inferno(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        return cv2.applyColorMap(gray, cv2.COLORMAP_INFERNO)
+        gray = self.context_for(frame).gray()
+        return color_luts.apply_colormap(gray, cv2.COLORMAP_INFERNO)
     
     def apply_magma(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        return cv2.applyColorMap(gray, cv2.COLORMAP_MAGMA)
+        gray = self.context_for(frame).gray()
+        return color_luts.apply_colormap(gray, cv2.COLORMAP_MAGMA)
     
     def apply_viridis(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        return cv2.applyColorMap(gray, cv2.COLORMAP_VIRIDIS)
+        gray = self.context_for(frame).gray()
+        return color_luts.apply_colormap(gray, cv2.COLORMAP_VIRIDIS)
     
     def apply_cool(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        return cv2.applyColorMap(gray, cv2.COLORMAP_COOL)
+        gray = self.context_for(frame).gray()
+        return color_luts.apply_colormap(gray, cv2.COLORMAP_COOL)
     
     def apply_hot(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        return cv2.applyColorMap(gray, cv2.COLORMAP_HOT)
+        gray = self.context_for(frame).gray()
+        return color_luts.apply_colormap(gray, cv2.COLORMAP_HOT)
     
     def apply_spring(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        return cv2.applyColorMap(gray, cv2.COLORMAP_SPRING)
+        gray = self.context_for(frame).gray()
+        return color_luts.apply_colormap(gray, cv2.COLORMAP_SPRING)
     
     def apply_summer(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        return cv2.applyColorMap(gray, cv2.COLORMAP_SUMMER)
+        gray = self.context_for(frame).gray()
+        return color_luts.apply_colormap(gray, cv2.COLORMAP_SUMMER)
     
     def apply_autumn(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        return cv2.applyColorMap(gray, cv2.COLORMAP_AUTUMN)
+        gray = self.context_for(frame).gray()
+        return color_luts.apply_colormap(gray, cv2.COLORMAP_AUTUMN)
     
     def apply_winter(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        return cv2.applyColorMap(gray, cv2.COLORMAP_WINTER)
+        gray = self.context_for(frame).gray()
+        return color_luts.apply_colormap(gray, cv2.COLORMAP_WINTER)
     
     def apply_rainbow_shift(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        hsv = self.context_for(frame).hsv().copy()
         hsv[:,:,0] = (hsv[:,:,0] + 60) % 180
         return cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
     
@@ -760,32 +1130,31 @@ class FaceFilter:
         return cv2.addWeighted(frame, 0.5, shifted, 0.5, 0)
     
     def apply_zoom_blur(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        result = frame.copy()
-        h_frame, w_frame = frame.shape[:2]
+        blurred = self.context_for(frame).blurred(15)
+        return self.apply_cached_warp(blurred, 'zoom_blur')
+    
+    def _build_zoom_blur_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_x = w_frame // 2
         center_y = h_frame // 2
         
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist = np.sqrt(dx*dx + dy*dy)
+        grid = self.get_polar_grid(w_frame, h_frame, center_x, center_y)
         max_dist = min(w_frame, h_frame) // 2
         
-        zoom_factor = 1.0 + (dist / max_dist) * 0.3
+        zoom_factor = 1.0 + (grid.dist / max_dist) * 0.3
         
-        new_x = center_x + dx * zoom_factor
-        new_y = center_y + dy * zoom_factor
+        new_x = center_x + grid.dx * zoom_factor
+        new_y = center_y + grid.dy * zoom_factor
         
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
         
-        blurred = cv2.GaussianBlur(result, (15, 15), 0)
-        return cv2.remap(blurred, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
     
     def apply_melt(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
+        return self.apply_cached_warp(frame, 'melt')
+    
+    def _build_melt_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
+        x_coords, y_coords = self.map_coords(w_frame, h_frame)
         
         melt_strength = 30.0
         new_y = y_coords + np.sin(x_coords * 0.05) * melt_strength
@@ -793,7 +1162,7 @@ class FaceFilter:
         map_x = x_coords.astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
         
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
     
     def apply_kaleidoscope(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
         h, w = frame.shape[:2]
@@ -826,11 +1195,8 @@ class FaceFilter:
         return self.apply_vhs(result, face)
     
     def apply_cyberpunk(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        hsv[:,:,0] = (hsv[:,:,0] + 120) % 180
-        hsv[:,:,2] = np.clip(hsv[:,:,2] * 1.3, 0, 255)
-        cyber = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
-        edges = cv2.Canny(frame, 50, 150)
+        cyber = color_luts.compile_pipeline(CYBERPUNK_PIPELINE).apply(frame)
+        edges = self.context_for(frame).canny(50, 150, color=True)
         edges_bgr = cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
         return cv2.addWeighted(cyber, 0.8, edges_bgr, 0.2, 0)
     
@@ -842,25 +1208,19 @@ class FaceFilter:
         return cv2.addWeighted(smoothed, 0.7, edges_bgr, 0.3, 0)
     
     def apply_glow(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        blurred = cv2.GaussianBlur(frame, (21, 21), 0)
+        blurred = self.context_for(frame).blurred(21)
         glow = cv2.addWeighted(frame, 1.2, blurred, 0.3, 0)
         return np.clip(glow, 0, 255)
     
     def apply_solarize(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        result = frame.astype(np.float32)
-        threshold = 128
-        mask = result > threshold
-        solarized = result.copy()
-        solarized[mask] = 255 - result[mask]
-        return np.clip(solarized, 0, 255).astype(np.uint8)
+        return color_luts.apply_lut(frame, color_luts.SOLARIZE)
     
     def apply_edge_detect(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        edges = cv2.Canny(gray, 50, 150)
+        edges = self.context_for(frame).canny(50, 150)
         return cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
     
     def apply_halftone(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = self.context_for(frame).gray()
         h, w = gray.shape
         small = cv2.resize(gray, (w//4, h//4))
         halftone = cv2.resize(small, (w, h), interpolation=cv2.INTER_NEAREST)
@@ -868,303 +1228,278 @@ class FaceFilter:
         return cv2.cvtColor(halftone, cv2.COLOR_GRAY2BGR)
     
     def apply_twirl(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
+        return self.apply_cached_warp(frame, 'twirl')
+    
+    def _build_twirl_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_x = w_frame // 2
         center_y = h_frame // 2
         radius = min(w_frame, h_frame) // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist = np.sqrt(dx*dx + dy*dy)
-        angle = np.arctan2(dy, dx)
+        grid = self.get_polar_grid(w_frame, h_frame, center_x, center_y)
         twirl_strength = 3.0
-        max_angle = twirl_strength * (1.0 - np.clip(dist / radius, 0, 1))
-        new_angle = angle + max_angle
-        new_x = center_x + dist * np.cos(new_angle)
-        new_y = center_y + dist * np.sin(new_angle)
+        max_angle = twirl_strength * (1.0 - np.clip(grid.dist / radius, 0, 1))
+        new_angle = grid.angle + max_angle
+        new_x = center_x + grid.dist * np.cos(new_angle)
+        new_y = center_y + grid.dist * np.sin(new_angle)
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
     
     def apply_ripple(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
+        return self.apply_cached_warp(frame, 'ripple')
+    
+    def _build_ripple_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_x = w_frame // 2
         center_y = h_frame // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist = np.sqrt(dx*dx + dy*dy)
+        grid = self.get_polar_grid(w_frame, h_frame, center_x, center_y)
         ripple_frequency = 0.1
         ripple_amplitude = 20.0
-        ripple = np.sin(dist * ripple_frequency) * ripple_amplitude
-        angle = np.arctan2(dy, dx)
-        new_x = x_coords + ripple * np.cos(angle)
-        new_y = y_coords + ripple * np.sin(angle)
+        ripple = np.sin(grid.dist * ripple_frequency) * ripple_amplitude
+        new_x = center_x + grid.dx + ripple * grid.cos
+        new_y = center_y + grid.dy + ripple * grid.sin
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
     
     def apply_sphere(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
+        return self.apply_cached_warp(frame, 'sphere')
+    
+    def _build_sphere_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_x = w_frame // 2
         center_y = h_frame // 2
         radius = min(w_frame, h_frame) // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist = np.sqrt(dx*dx + dy*dy)
-        normalized_dist = np.clip(dist / radius, 0, 1)
+        grid = self.get_polar_grid(w_frame, h_frame, center_x, center_y)
+        normalized_dist = np.clip(grid.dist / radius, 0, 1)
         sphere_strength = 0.5
         new_dist = normalized_dist * (1.0 - sphere_strength * normalized_dist)
         new_dist = new_dist * radius
-        angle = np.arctan2(dy, dx)
-        new_x = center_x + new_dist * np.cos(angle)
-        new_y = center_y + new_dist * np.sin(angle)
+        new_x = center_x + new_dist * grid.cos
+        new_y = center_y + new_dist * grid.sin
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
     
     def apply_tunnel(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
+        return self.apply_cached_warp(frame, 'tunnel')
+    
+    def _build_tunnel_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_x = w_frame // 2
         center_y = h_frame // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist = np.sqrt(dx*dx + dy*dy)
+        grid = self.get_polar_grid(w_frame, h_frame, center_x, center_y)
         max_dist = min(w_frame, h_frame) // 2
-        normalized_dist = np.clip(dist / max_dist, 0, 1)
+        normalized_dist = np.clip(grid.dist / max_dist, 0, 1)
         tunnel_strength = 0.8
         new_dist = normalized_dist * (1.0 + tunnel_strength * normalized_dist)
         new_dist = new_dist * max_dist
-        angle = np.arctan2(dy, dx)
-        new_x = center_x + new_dist * np.cos(angle)
-        new_y = center_y + new_dist * np.sin(angle)
+        new_x = center_x + new_dist * grid.cos
+        new_y = center_y + new_dist * grid.sin
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
     
     def apply_water_ripple(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
+        return self.apply_cached_warp(frame, 'water_ripple')
+    
+    def _build_water_ripple_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_x = w_frame // 2
         center_y = h_frame // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist = np.sqrt(dx*dx + dy*dy)
+        grid = self.get_polar_grid(w_frame, h_frame, center_x, center_y)
         ripple_frequency = 0.05
         ripple_amplitude = 15.0
-        ripple = np.sin(dist * ripple_frequency) * ripple_amplitude
-        angle = np.arctan2(dy, dx)
-        new_x = x_coords + ripple * np.cos(angle)
-        new_y = y_coords + ripple * np.sin(angle)
+        ripple = np.sin(grid.dist * ripple_frequency) * ripple_amplitude
+        new_x = center_x + grid.dx + ripple * grid.cos
+        new_y = center_y + grid.dy + ripple * grid.sin
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
     
     def apply_radial_blur(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
+        blurred = self.context_for(frame).blurred(15)
+        return self.apply_cached_warp(blurred, 'radial_blur')
+    
+    def _build_radial_blur_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_x = w_frame // 2
         center_y = h_frame // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist = np.sqrt(dx*dx + dy*dy)
+        grid = self.get_polar_grid(w_frame, h_frame, center_x, center_y)
         max_dist = min(w_frame, h_frame) // 2
         blur_strength = 5.0
-        offset = blur_strength * (dist / max_dist)
-        angle = np.arctan2(dy, dx)
-        new_x = x_coords + offset * np.cos(angle)
-        new_y = y_coords + offset * np.sin(angle)
+        offset = blur_strength * (grid.dist / max_dist)
+        new_x = center_x + grid.dx + offset * grid.cos
+        new_y = center_y + grid.dy + offset * grid.sin
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        blurred = cv2.GaussianBlur(frame, (15, 15), 0)
-        return cv2.remap(blurred, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
     
     def apply_cylinder(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
+        return self.apply_cached_warp(frame, 'cylinder')
+    
+    def _build_cylinder_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_x = w_frame // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
+        x_coords, y_coords = self.map_coords(w_frame, h_frame)
         dx = x_coords - center_x
         cylinder_strength = 0.3
         new_x = center_x + dx * (1.0 - cylinder_strength * (dx / (w_frame // 2))**2)
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = y_coords.astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
     
     def apply_barrel(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
+        return self.apply_cached_warp(frame, 'barrel')
+    
+    def _build_barrel_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_x = w_frame // 2
         center_y = h_frame // 2
         radius = min(w_frame, h_frame) // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist = np.sqrt(dx*dx + dy*dy)
-        normalized_dist = np.clip(dist / radius, 0, 1)
+        grid = self.get_polar_grid(w_frame, h_frame, center_x, center_y)
+        normalized_dist = np.clip(grid.dist / radius, 0, 1)
         barrel_strength = 0.3
         new_dist = normalized_dist * (1.0 + barrel_strength * normalized_dist * normalized_dist)
         new_dist = new_dist * radius
-        angle = np.arctan2(dy, dx)
-        new_x = center_x + new_dist * np.cos(angle)
-        new_y = center_y + new_dist * np.sin(angle)
+        new_x = center_x + new_dist * grid.cos
+        new_y = center_y + new_dist * grid.sin
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
     
     def apply_pincushion(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
+        return self.apply_cached_warp(frame, 'pincushion')
+    
+    def _build_pincushion_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_x = w_frame // 2
         center_y = h_frame // 2
         radius = min(w_frame, h_frame) // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist = np.sqrt(dx*dx + dy*dy)
-        normalized_dist = np.clip(dist / radius, 0, 1)
+        grid = self.get_polar_grid(w_frame, h_frame, center_x, center_y)
+        normalized_dist = np.clip(grid.dist / radius, 0, 1)
         pincushion_strength = 0.4
         new_dist = normalized_dist * (1.0 - pincushion_strength * normalized_dist)
         new_dist = new_dist * radius
-        angle = np.arctan2(dy, dx)
-        new_x = center_x + new_dist * np.cos(angle)
-        new_y = center_y + new_dist * np.sin(angle)
+        new_x = center_x + new_dist * grid.cos
+        new_y = center_y + new_dist * grid.sin
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
     
     def apply_whirlpool(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
+        return self.apply_cached_warp(frame, 'whirlpool')
+    
+    def _build_whirlpool_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_x = w_frame // 2
         center_y = h_frame // 2
         radius = min(w_frame, h_frame) // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist = np.sqrt(dx*dx + dy*dy)
-        angle = np.arctan2(dy, dx)
+        grid = self.get_polar_grid(w_frame, h_frame, center_x, center_y)
         whirlpool_strength = 4.0
-        max_angle = whirlpool_strength * (1.0 - np.clip(dist / radius, 0, 1))
-        new_angle = angle + max_angle
-        new_dist = dist * 0.9
+        max_angle = whirlpool_strength * (1.0 - np.clip(grid.dist / radius, 0, 1))
+        new_angle = grid.angle + max_angle
+        new_dist = grid.dist * 0.9
         new_x = center_x + new_dist * np.cos(new_angle)
         new_y = center_y + new_dist * np.sin(new_angle)
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
     
     def apply_radial_zoom(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
+        return self.apply_cached_warp(frame, 'radial_zoom')
+    
+    def _build_radial_zoom_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_x = w_frame // 2
         center_y = h_frame // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist = np.sqrt(dx*dx + dy*dy)
+        grid = self.get_polar_grid(w_frame, h_frame, center_x, center_y)
         max_dist = min(w_frame, h_frame) // 2
         zoom_strength = 0.5
-        zoom_factor = 1.0 + zoom_strength * (1.0 - dist / max_dist)
-        new_x = center_x + dx * zoom_factor
-        new_y = center_y + dy * zoom_factor
+        zoom_factor = 1.0 + zoom_strength * (1.0 - grid.dist / max_dist)
+        new_x = center_x + grid.dx * zoom_factor
+        new_y = center_y + grid.dy * zoom_factor
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
     
     def apply_concave(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
+        return self.apply_cached_warp(frame, 'concave')
+    
+    def _build_concave_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_x = w_frame // 2
         center_y = h_frame // 2
         radius = min(w_frame, h_frame) // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist = np.sqrt(dx*dx + dy*dy)
-        normalized_dist = np.clip(dist / radius, 0, 1)
+        grid = self.get_polar_grid(w_frame, h_frame, center_x, center_y)
+        normalized_dist = np.clip(grid.dist / radius, 0, 1)
         concave_strength = 0.6
         new_dist = normalized_dist * (1.0 - concave_strength * normalized_dist)
         new_dist = new_dist * radius
-        angle = np.arctan2(dy, dx)
-        new_x = center_x + new_dist * np.cos(angle)
-        new_y = center_y + new_dist * np.sin(angle)
+        new_x = center_x + new_dist * grid.cos
+        new_y = center_y + new_dist * grid.sin
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
     
     def apply_convex(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
+        return self.apply_cached_warp(frame, 'convex')
+    
+    def _build_convex_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_x = w_frame // 2
         center_y = h_frame // 2
         radius = min(w_frame, h_frame) // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist = np.sqrt(dx*dx + dy*dy)
-        normalized_dist = np.clip(dist / radius, 0, 1)
+        grid = self.get_polar_grid(w_frame, h_frame, center_x, center_y)
+        normalized_dist = np.clip(grid.dist / radius, 0, 1)
         convex_strength = 0.5
         new_dist = normalized_dist * (1.0 + convex_strength * normalized_dist)
         new_dist = new_dist * radius
-        angle = np.arctan2(dy, dx)
-        new_x = center_x + new_dist * np.cos(angle)
-        new_y = center_y + new_dist * np.sin(angle)
+        new_x = center_x + new_dist * grid.cos
+        new_y = center_y + new_dist * grid.sin
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
     
     def apply_spiral(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
+        return self.apply_cached_warp(frame, 'spiral')
+    
+    def _build_spiral_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_x = w_frame // 2
         center_y = h_frame // 2
         radius = min(w_frame, h_frame) // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist = np.sqrt(dx*dx + dy*dy)
-        angle = np.arctan2(dy, dx)
+        grid = self.get_polar_grid(w_frame, h_frame, center_x, center_y)
         spiral_turns = 2.0
-        spiral_angle = angle + spiral_turns * np.pi * (dist / radius)
-        new_x = center_x + dist * np.cos(spiral_angle)
-        new_y = center_y + dist * np.sin(spiral_angle)
+        spiral_angle = grid.angle + spiral_turns * np.pi * (grid.dist / radius)
+        new_x = center_x + grid.dist * np.cos(spiral_angle)
+        new_y = center_y + grid.dist * np.sin(spiral_angle)
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
     
     def apply_radial_stretch(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
+        return self.apply_cached_warp(frame, 'radial_stretch')
+    
+    def _build_radial_stretch_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_x = w_frame // 2
         center_y = h_frame // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist = np.sqrt(dx*dx + dy*dy)
+        grid = self.get_polar_grid(w_frame, h_frame, center_x, center_y)
         max_dist = min(w_frame, h_frame) // 2
-        stretch_factor = 1.0 + 0.5 * (dist / max_dist)
-        angle = np.arctan2(dy, dx)
-        new_x = center_x + dist * stretch_factor * np.cos(angle)
-        new_y = center_y + dist * stretch_factor * np.sin(angle)
+        stretch_factor = 1.0 + 0.5 * (grid.dist / max_dist)
+        new_x = center_x + grid.dist * stretch_factor * grid.cos
+        new_y = center_y + grid.dist * stretch_factor * grid.sin
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
     
     def apply_radial_compress(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
+        return self.apply_cached_warp(frame, 'radial_compress')
+    
+    def _build_radial_compress_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_x = w_frame // 2
         center_y = h_frame // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist = np.sqrt(dx*dx + dy*dy)
+        grid = self.get_polar_grid(w_frame, h_frame, center_x, center_y)
         max_dist = min(w_frame, h_frame) // 2
-        compress_factor = 1.0 - 0.3 * (dist / max_dist)
-        angle = np.arctan2(dy, dx)
-        new_x = center_x + dist * compress_factor * np.cos(angle)
-        new_y = center_y + dist * compress_factor * np.sin(angle)
+        compress_factor = 1.0 - 0.3 * (grid.dist / max_dist)
+        new_x = center_x + grid.dist * compress_factor * grid.cos
+        new_y = center_y + grid.dist * compress_factor * grid.sin
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
     
     def apply_vertical_wave(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
+        return self.apply_cached_warp(frame, 'vertical_wave')
+    
+    def _build_vertical_wave_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_y = h_frame // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
+        x_coords, y_coords = self.map_coords(w_frame, h_frame)
         wave_amplitude = 25.0
         wave_frequency = 0.05
         wave_phase = np.sin((x_coords - w_frame//2) * wave_frequency) * wave_amplitude
@@ -1172,12 +1507,14 @@ class FaceFilter:
         new_y = y_coords + wave_phase
         map_x = new_x.astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
     
     def apply_horizontal_wave(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
+        return self.apply_cached_warp(frame, 'horizontal_wave')
+    
+    def _build_horizontal_wave_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_x = w_frame // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
+        x_coords, y_coords = self.map_coords(w_frame, h_frame)
         wave_amplitude = 25.0
         wave_frequency = 0.05
         wave_phase = np.sin((y_coords - h_frame//2) * wave_frequency) * wave_amplitude
@@ -1185,181 +1522,113 @@ class FaceFilter:
         new_y = y_coords
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = new_y.astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
     
     def apply_skew_horizontal(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
-        center_y = h_frame // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
+        center_y = frame.shape[0] // 2
         skew_strength = 0.3
-        offset = (y_coords - center_y) * skew_strength
-        new_x = x_coords + offset
-        new_y = y_coords
-        map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
-        map_y = new_y.astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        matrix = np.float32([[1, skew_strength, -center_y * skew_strength], [0, 1, 0]])
+        return self.warp_affine(frame, matrix)
     
     def apply_skew_vertical(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
-        center_x = w_frame // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
+        center_x = frame.shape[1] // 2
         skew_strength = 0.3
-        offset = (x_coords - center_x) * skew_strength
-        new_x = x_coords
-        new_y = y_coords + offset
-        map_x = new_x.astype(np.float32)
-        map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        matrix = np.float32([[1, 0, 0], [skew_strength, 1, -center_x * skew_strength]])
+        return self.warp_affine(frame, matrix)
     
     def apply_rotate_zoom(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
+        return self.apply_cached_warp(frame, 'rotate_zoom')
+    
+    def _build_rotate_zoom_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_x = w_frame // 2
         center_y = h_frame // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist = np.sqrt(dx*dx + dy*dy)
+        grid = self.get_polar_grid(w_frame, h_frame, center_x, center_y)
         max_dist = min(w_frame, h_frame) // 2
-        angle = np.arctan2(dy, dx)
-        rotation = 2.0 * np.pi * (dist / max_dist)
-        zoom_factor = 1.0 + 0.3 * (dist / max_dist)
-        new_angle = angle + rotation
-        new_dist = dist * zoom_factor
+        rotation = 2.0 * np.pi * (grid.dist / max_dist)
+        zoom_factor = 1.0 + 0.3 * (grid.dist / max_dist)
+        new_angle = grid.angle + rotation
+        new_dist = grid.dist * zoom_factor
         new_x = center_x + new_dist * np.cos(new_angle)
         new_y = center_y + new_dist * np.sin(new_angle)
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
     
     def apply_radial_wave(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
+        return self.apply_cached_warp(frame, 'radial_wave')
+    
+    def _build_radial_wave_maps(self, w_frame: int, h_frame: int) -> Tuple[np.ndarray, np.ndarray]:
         center_x = w_frame // 2
         center_y = h_frame // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist = np.sqrt(dx*dx + dy*dy)
-        angle = np.arctan2(dy, dx)
+        grid = self.get_polar_grid(w_frame, h_frame, center_x, center_y)
         wave_frequency = 0.1
         wave_amplitude = 15.0
-        radial_wave = np.sin(dist * wave_frequency) * wave_amplitude
-        new_angle = angle + radial_wave / np.maximum(dist, 1)
-        new_x = center_x + dist * np.cos(new_angle)
-        new_y = center_y + dist * np.sin(new_angle)
+        radial_wave = np.sin(grid.dist * wave_frequency) * wave_amplitude
+        new_angle = grid.angle + radial_wave / np.maximum(grid.dist, 1)
+        new_x = center_x + grid.dist * np.cos(new_angle)
+        new_y = center_y + grid.dist * np.sin(new_angle)
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return map_x, map_y
     
     def apply_zoom_in(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
-        center_x = w_frame // 2
-        center_y = h_frame // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        zoom_factor = 1.3
-        new_x = center_x + dx / zoom_factor
-        new_y = center_y + dy / zoom_factor
-        map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
-        map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return self.warp_affine(frame, self.zoom_matrix(frame, 1.3))
     
     def apply_zoom_out(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
-        center_x = w_frame // 2
-        center_y = h_frame // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        zoom_factor = 0.8
-        new_x = center_x + dx / zoom_factor
-        new_y = center_y + dy / zoom_factor
-        map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
-        map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return self.warp_affine(frame, self.zoom_matrix(frame, 0.8))
     
     def apply_fast_zoom_in(self, frame: np.ndarray, face: Tuple[int, int, int, int], frame_count: int = 0) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
-        center_x = w_frame // 2
-        center_y = h_frame // 2
         fps = 30.0
         animation_speed = 2.0
         zoom_factor = 1.0 + (frame_count / fps * animation_speed) % 2.0
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        new_x = center_x + dx / zoom_factor
-        new_y = center_y + dy / zoom_factor
-        map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
-        map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return self.warp_affine(frame, self.zoom_matrix(frame, zoom_factor))
     
     def apply_fast_zoom_out(self, frame: np.ndarray, face: Tuple[int, int, int, int], frame_count: int = 0) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
-        center_x = w_frame // 2
-        center_y = h_frame // 2
         fps = 30.0
         animation_speed = 2.0
         zoom_factor = 1.5 - (frame_count / fps * animation_speed) % 1.0
         zoom_factor = max(0.5, zoom_factor)
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        new_x = center_x + dx / zoom_factor
-        new_y = center_y + dy / zoom_factor
-        map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
-        map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return self.warp_affine(frame, self.zoom_matrix(frame, zoom_factor))
     
     def apply_shake(self, frame: np.ndarray, face: Tuple[int, int, int, int], frame_count: int = 0) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
         fps = 30.0
         animation_speed = 20.0
         shake_amount = 15.0
         offset_x = shake_amount * np.sin(frame_count / fps * animation_speed * 2 * np.pi)
         offset_y = shake_amount * np.cos(frame_count / fps * animation_speed * 2 * np.pi)
-        M = np.float32([[1, 0, offset_x], [0, 1, offset_y]])
-        return cv2.warpAffine(frame, M, (w_frame, h_frame), borderMode=cv2.BORDER_REPLICATE)
+        matrix = np.float32([[1, 0, -offset_x], [0, 1, -offset_y]])
+        return self.warp_affine(frame, matrix)
     
     def apply_pulse(self, frame: np.ndarray, face: Tuple[int, int, int, int], frame_count: int = 0) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
-        center_x = w_frame // 2
-        center_y = h_frame // 2
         fps = 30.0
         animation_speed = 3.0
         animation_cycle = (frame_count / fps * animation_speed * 2 * np.pi) % (2 * np.pi)
         zoom_factor = 1.0 + 0.15 * np.sin(animation_cycle)
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        new_x = center_x + dx / zoom_factor
-        new_y = center_y + dy / zoom_factor
-        map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
-        map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return self.warp_affine(frame, self.zoom_matrix(frame, zoom_factor))
     
     def apply_spiral_zoom(self, frame: np.ndarray, face: Tuple[int, int, int, int], frame_count: int = 0) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
-        center_x = w_frame // 2
-        center_y = h_frame // 2
         fps = 30.0
         animation_speed = 2.0
-        animation_cycle = (frame_count / fps * animation_speed * 2 * np.pi) % (2 * np.pi)
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        dist = np.sqrt(dx*dx + dy*dy)
-        angle = np.arctan2(dy, dx)
+        phase = (frame_count / fps * animation_speed) % 1.0
+        return self.apply_animated_warp(frame, 'spiral_zoom', phase)
+    
+    def _build_spiral_zoom_keyframe(self, w_frame: int, h_frame: int, phase: float) -> Tuple[np.ndarray, np.ndarray]:
+        center_x = w_frame // 2
+        center_y = h_frame // 2
+        animation_cycle = phase * 2 * np.pi
+        grid = self.get_polar_grid(w_frame, h_frame, center_x, center_y)
         max_dist = np.sqrt(center_x*center_x + center_y*center_y)
-        zoom_factor = 1.0 + 0.3 * np.sin(dist / max_dist * 4 * np.pi + animation_cycle)
-        new_angle = angle + animation_cycle * 0.5
-        new_dist = dist / zoom_factor
-        new_x = center_x + new_dist * np.cos(new_angle)
-        new_y = center_y + new_dist * np.sin(new_angle)
+        zoom_factor = 1.0 + 0.3 * np.sin(grid.dist * (4 * np.pi / max_dist) + animation_cycle)
+        # Rotate the cached cos/sin planes by the frame's angle offset instead of re-running trig
+        rotation = animation_cycle * 0.5
+        cos_r, sin_r = np.cos(rotation), np.sin(rotation)
+        new_dist = grid.dist / zoom_factor
+        new_x = center_x + new_dist * (grid.cos * cos_r - grid.sin * sin_r)
+        new_y = center_y + new_dist * (grid.sin * cos_r + grid.cos * sin_r)
         map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
         map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
-    
+        return map_x, map_y
+
     def apply_puzzle(self, frame: np.ndarray, face: Tuple[int, int, int, int], frame_count: int = 0) -> np.ndarray:
         h_frame, w_frame = frame.shape[:2]
         result = np.zeros_like(frame)
@@ -1447,8 +1716,6 @@ class FaceFilter:
     
     def apply_extreme_closeup(self, frame: np.ndarray, face: Tuple[int, int, int, int], frame_count: int = 0) -> np.ndarray:
         h_frame, w_frame = frame.shape[:2]
-        center_x = w_frame // 2
-        center_y = h_frame // 2
         
         fps = 30.0
         animation_speed = 1.5
@@ -1457,14 +1724,7 @@ class FaceFilter:
         zoom_factor = 1.0 + 2.5 * (0.5 + 0.5 * np.sin(animation_cycle))
         zoom_factor = max(1.0, min(zoom_factor, 4.0))
         
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        new_x = center_x + dx / zoom_factor
-        new_y = center_y + dy / zoom_factor
-        map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
-        map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        result = cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        result = self.warp_affine(frame, self.zoom_matrix(frame, zoom_factor))
         
         font = cv2.FONT_HERSHEY_SIMPLEX
         text = "EXTREME CLOSE-UP"
@@ -1481,39 +1741,13 @@ class FaceFilter:
         return result
     
     def apply_rotate(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
-        center_x = w_frame // 2
-        center_y = h_frame // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        rotation_angle = np.pi / 4
-        cos_a = np.cos(rotation_angle)
-        sin_a = np.sin(rotation_angle)
-        new_x = center_x + dx * cos_a - dy * sin_a
-        new_y = center_y + dx * sin_a + dy * cos_a
-        map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
-        map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return self.warp_affine(frame, self.rotation_matrix(frame, np.pi / 4))
     
     def apply_rotate_45(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
         return self.apply_rotate(frame, face)
     
     def apply_rotate_90(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
-        h_frame, w_frame = frame.shape[:2]
-        center_x = w_frame // 2
-        center_y = h_frame // 2
-        y_coords, x_coords = np.meshgrid(np.arange(h_frame), np.arange(w_frame), indexing='ij')
-        dx = x_coords - center_x
-        dy = y_coords - center_y
-        rotation_angle = np.pi / 2
-        cos_a = np.cos(rotation_angle)
-        sin_a = np.sin(rotation_angle)
-        new_x = center_x + dx * cos_a - dy * sin_a
-        new_y = center_y + dx * sin_a + dy * cos_a
-        map_x = np.clip(new_x, 0, w_frame - 1).astype(np.float32)
-        map_y = np.clip(new_y, 0, h_frame - 1).astype(np.float32)
-        return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        return self.warp_affine(frame, self.rotation_matrix(frame, np.pi / 2))
     
     def apply_flip_horizontal(self, frame: np.ndarray, face: Tuple[int, int, int, int]) -> np.ndarray:
         return cv2.flip(frame, 1)
@@ -1555,6 +1789,7 @@ class FaceFilter:
         
     def run(self, filter_type: str, show_preview: bool = True, backend: Optional[str] = None, preview_only: bool = False):
         filter_funcs = {
+            'ultimate_distortion': self.apply_ultimate_distortion,
             'bulge': self.apply_bulge,
             'stretch': self.apply_stretch,
             'swirl': self.apply_swirl,
@@ -1701,7 +1936,8 @@ class FaceFilter:
                 if not ret:
                     break
                 
-                face = self.detect_face(frame)
+                self.begin_frame(frame)
+                face = self.track_face(frame)
                 if face:
                     frame = filter_func(frame, face)
                 
@@ -1730,19 +1966,40 @@ def main():
                        help='Filter type to apply')
     parser.add_argument('--width', type=int, default=1280, help='Camera width (default: 1280)')
     parser.add_argument('--height', type=int, default=720, help='Camera height (default: 720)')
-    parser.add_argument('--fps', type=int, default=30, help='FPS (default: 30)')
+    parser.add_argument('--fps', type=int, default=30, help='FPS (default: 15)')
     parser.add_argument('--preview', action='store_true', help='Show preview window (default: True)')
     parser.add_argument('--no-preview', action='store_true', help='Hide preview window')
     parser.add_argument('--preview-only', action='store_true', help='Preview window only, no virtual camera')
     parser.add_argument('--backend', type=str, choices=['obs', 'unity', 'v4l2loopback'], 
                        help='Virtual camera backend (default: auto-detect)')
+    parser.add_argument('--float-maps', action='store_true',
+                       help='Use float warp maps instead of fixed-point ones (bit-exact output)')
+    parser.add_argument('--anim-keyframes', type=int, default=15,
+                       help='Cached keyframes per period for animated warps (default: 15)')
+    parser.add_argument('--anim-blend', action='store_true',
+                       help='Blend neighbouring animation keyframes instead of snapping to the nearest')
+    parser.add_argument('--detect-interval', type=int, default=10,
+                       help='Run full face detection every N frames and track in between (default: 10)')
+    parser.add_argument('--detect-scale', type=float, default=None,
+                       help='Scale of the frame used for face detection, e.g. 0.5 (default: auto)')
+    parser.add_argument('--sync-detection', action='store_true',
+                       help='Detect faces on the render thread instead of a background worker')
+    parser.add_argument('--detector', choices=['auto', 'haar', 'lbp', 'dnn', 'mediapipe'], default='auto',
+                       help='Face detector backend (default: auto, the one saved by benchmark_detectors.py --save, else haar)')
+    parser.add_argument('--map-scale', type=int, choices=[1, 4, 8], default=1,
+                       help='Build warp maps at 1/N resolution and upsample them (default: 1)')
     
     args = parser.parse_args()
     
     show_preview = not args.no_preview
     
     try:
-        with FaceFilter(width=args.width, height=args.height, fps=args.fps) as filter_app:
+        with FaceFilter(width=args.width, height=args.height, fps=args.fps,
+                        fixed_point_maps=not args.float_maps, anim_keyframes=args.anim_keyframes,
+                        anim_blend=args.anim_blend, map_scale=args.map_scale,
+                        detect_interval=args.detect_interval, detect_scale=args.detect_scale,
+                        async_detection=not args.sync_detection, face_detector=args.detector,
+                        streaming=True) as filter_app:
             filter_app.run(args.filter, show_preview=show_preview, backend=args.backend, preview_only=args.preview_only)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
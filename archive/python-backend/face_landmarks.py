@@ -0,0 +1,172 @@
+"""
+Facial landmarks for WesWorld FX
+MediaPipe FaceMesh is created on first use and runs on a downscaled frame; for
+video streams it runs at a limited rate and a One-Euro filter smooths the key
+points between and across runs
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from cache_manager import CacheNamespace, content_hash
+from frame_context import FrameContext
+
+try:
+    import mediapipe as mp
+    MEDIAPIPE_AVAILABLE = True
+except ImportError:
+    MEDIAPIPE_AVAILABLE = False
+
+
+# FaceMesh indices of the points the mask filters use (eyes first)
+KEY_POINTS = {
+    'left_eye': 33,     # Left eye outer corner
+    'right_eye': 263,   # Right eye outer corner
+    'nose': 1,          # Nose tip
+    'chin': 175,
+    'forehead': 10,     # Forehead center
+}
+
+
+class OneEuroFilter:
+    """
+    One-Euro low-pass filter for a vector signal: the cutoff rises with the signal's
+    speed, so a still face is smoothed heavily while fast motion lags very little
+    """
+
+    def __init__(self, min_cutoff: float = 1.0, beta: float = 0.05, d_cutoff: float = 1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.derivative = None
+        self.timestamp = None
+
+    @staticmethod
+    def _alpha(cutoff, dt: float):
+        tau = 1.0 / (2 * np.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, value: np.ndarray, timestamp: float) -> np.ndarray:
+        value = np.asarray(value, dtype=np.float64)
+        if self.value is None:
+            self.value = value
+            self.derivative = np.zeros_like(value)
+            self.timestamp = timestamp
+            return value
+        dt = max(timestamp - self.timestamp, 1e-3)
+        self.timestamp = timestamp
+        derivative = (value - self.value) / dt
+        self.derivative += self._alpha(self.d_cutoff, dt) * (derivative - self.derivative)
+        # Per-point cutoff from the speed of that point
+        speed = np.linalg.norm(self.derivative, axis=-1, keepdims=True)
+        alpha = self._alpha(self.min_cutoff + self.beta * speed, dt)
+        self.value = self.value + alpha * (value - self.value)
+        return self.value
+
+
+class LandmarkDetector:
+    """
+    Key facial landmarks of up to max_faces faces from MediaPipe FaceMesh. Every call
+    runs on its own frame unless streaming, where runs are rate-limited and smoothed
+    """
+
+    def __init__(self, max_width: int = 480, min_interval: float = 0.0, max_faces: int = 4,
+                 min_cutoff: float = 1.0, beta: float = 0.05, memo: Optional[CacheNamespace] = None,
+                 streaming: bool = False):
+        # Inference runs on a copy of the frame at most max_width pixels wide
+        self.max_width = max_width
+        # Frames are consecutive frames of one video: rate limiting and smoothing carry across them
+        self.streaming = streaming
+        # Minimum seconds between FaceMesh runs when streaming; frames in between reuse the smoothed points
+        self.min_interval = min_interval
+        self.max_faces = max_faces
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        # One smoother per tracked face, matched to new detections by eye position
+        self.smoothers: List[OneEuroFilter] = []
+        # Optional cache of raw FaceMesh points keyed by a hash of the inference image
+        self.memo = memo
+        self.face_mesh = None
+        self.available = MEDIAPIPE_AVAILABLE
+        self.last_run = None
+        self.frame_shape = None
+        self.landmarks: List[dict] = []
+        self.runs = 0
+
+    def _mesh(self):
+        # Built on first use: filters that never ask for landmarks never load the model
+        if self.face_mesh is None:
+            self.face_mesh = mp.solutions.face_mesh.FaceMesh(
+                static_image_mode=False,
+                max_num_faces=self.max_faces,
+                refine_landmarks=False,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5
+            )
+        return self.face_mesh
+
+    def detect(self, context: FrameContext) -> List[dict]:
+        """
+        Landmarks of every face in a frame. When streaming, FaceMesh only runs once the last
+        run is older than min_interval and the points are smoothed across frames
+        """
+        if not self.available:
+            return []
+        h, w = context.frame.shape[:2]
+        if (h, w) != self.frame_shape or not self.streaming:
+            self.frame_shape = (h, w)
+            self.last_run = None
+            self.smoothers = []
+        if self.last_run is not None and context.timestamp - self.last_run < self.min_interval:
+            return self.landmarks
+
+        self.last_run = context.timestamp
+        self.runs += 1
+        rgb = context.scaled_rgb(min(1.0, self.max_width / w))
+        memo_key = ('landmarks', self.max_faces, (h, w), content_hash(rgb))
+        faces = self.memo.get(memo_key) if self.memo is not None else None
+        if faces is None:
+            # Landmarks come back normalized, so the downscaled frame needs no coordinate mapping
+            results = self._mesh().process(rgb)
+            faces = [np.array([(face.landmark[i].x * w, face.landmark[i].y * h) for i in KEY_POINTS.values()])
+                     for face in results.multi_face_landmarks or []]
+            if self.memo is not None:
+                self.memo.put(memo_key, faces)
+        self.landmarks = [
+            measure_landmarks({name: (int(x), int(y)) for name, (x, y) in zip(KEY_POINTS, points)})
+            for points in (self._smooth(faces, context.timestamp) if self.streaming else faces)
+        ]
+        return self.landmarks
+
+    def _smooth(self, faces: List[np.ndarray], timestamp: float) -> List[np.ndarray]:
+        # Each face continues the smoother whose last eye center is nearest, if within one eye distance
+        unused = list(self.smoothers)
+        self.smoothers = []
+        smoothed = []
+        for points in faces:
+            center = points[:2].mean(axis=0)
+            reach = np.linalg.norm(points[1] - points[0])
+            nearest = min(unused, key=lambda f: np.linalg.norm(f.value[:2].mean(axis=0) - center), default=None)
+            if nearest is not None and np.linalg.norm(nearest.value[:2].mean(axis=0) - center) <= reach:
+                unused.remove(nearest)
+            else:
+                nearest = OneEuroFilter(min_cutoff=self.min_cutoff, beta=self.beta)
+            self.smoothers.append(nearest)
+            smoothed.append(nearest(points, timestamp))
+        return smoothed
+
+
+def measure_landmarks(points: Dict[str, tuple]) -> dict:
+    """Add eye center, eye distance, face height and face angle to the key points"""
+    left_eye, right_eye = points['left_eye'], points['right_eye']
+    chin, forehead = points['chin'], points['forehead']
+    eye_distance = np.sqrt((right_eye[0] - left_eye[0])**2 + (right_eye[1] - left_eye[1])**2)
+    face_height = np.sqrt((chin[0] - forehead[0])**2 + (chin[1] - forehead[1])**2)
+    eye_center = ((left_eye[0] + right_eye[0]) // 2, (left_eye[1] + right_eye[1]) // 2)
+    face_angle = np.arctan2(right_eye[1] - left_eye[1], right_eye[0] - left_eye[0])
+    return dict(points, eye_center=eye_center, eye_distance=eye_distance,
+                face_height=face_height, face_angle=face_angle)
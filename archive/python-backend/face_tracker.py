@@ -0,0 +1,135 @@
+"""
+Temporal face tracking for WesWorld FX
+Runs the (expensive) face detector every few frames and follows the face box
+in between with a normalized template match around its last position
+"""
+from typing import Callable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+Box = Tuple[int, int, int, int]
+
+
+class FaceTracker:
+    """Propagates a detected face box between periodic full detections"""
+
+    def __init__(self, detector: Callable[[np.ndarray], Optional[Box]], detect_interval: int = 10,
+                 min_confidence: float = 0.6, search_margin: float = 0.5, template_width: int = 48):
+        self.detector = detector
+        self.detect_interval = detect_interval
+        self.min_confidence = min_confidence
+        # Search window around the last box, as a fraction of the box size on each side
+        self.search_margin = search_margin
+        # Matching runs on copies scaled so the face template is about this wide
+        self.template_width = template_width
+        self.box: Optional[Box] = None
+        self.confidence = 0.0
+        self.template = None
+        self.scale = 1.0
+        self.frames_since_detection = 0
+        self.frame_shape = None
+        self.seeded_index = None
+        self.detections = 0
+        self.tracked_frames = 0
+
+    def reset(self):
+        self.box = None
+        self.template = None
+        self.confidence = 0.0
+
+    def update(self, frame: np.ndarray, gray: Optional[np.ndarray] = None) -> Optional[Box]:
+        """Return the face box for this frame, detecting only when the schedule or confidence requires it"""
+        if gray is None:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if frame.shape[:2] != self.frame_shape:
+            self.frame_shape = frame.shape[:2]
+            self.reset()
+
+        if self.box is not None and self.frames_since_detection < self.detect_interval:
+            box, confidence = self._track(gray)
+            if confidence >= self.min_confidence:
+                self.box = box
+                self.confidence = confidence
+                self.frames_since_detection += 1
+                self.tracked_frames += 1
+                return box
+
+        return self._detect(frame, gray)
+
+    def follow(self, frame: np.ndarray, result, frame_index: int, gray: Optional[np.ndarray] = None) -> Optional[Box]:
+        """
+        Track against detections published by a DetectionWorker instead of detecting here.
+        A new result re-seeds the template from the gray frame it was detected on. While
+        the face is being tracked the box keeps following it; otherwise the search starts
+        at the detected box and widens with the result's age, so results that arrive a
+        few frames late still land on the face.
+        """
+        if result is None:
+            return None
+        if gray is None:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        margin = self.search_margin
+        if result.frame_index != self.seeded_index:
+            self.seeded_index = result.frame_index
+            if not result.faces or result.gray.shape != gray.shape:
+                self.reset()
+                return None
+            previous = self.box
+            self.seed(result.gray, result.faces[0])
+            if previous is not None:
+                # Keep the detected size, centred where the face is being tracked now
+                x, y, w, h = self.box
+                center_x, center_y = previous[0] + previous[2] // 2, previous[1] + previous[3] // 2
+                self.box = self._clamp(gray, center_x - w // 2, center_y - h // 2, w, h)
+            else:
+                margin = min(2.0, self.search_margin * (1 + 0.25 * (frame_index - result.frame_index)))
+        if self.box is None:
+            return None
+        box, self.confidence = self._track(gray, margin)
+        if self.confidence >= self.min_confidence:
+            self.box = box
+            self.tracked_frames += 1
+        return self.box
+
+    def seed(self, gray: np.ndarray, box: Box) -> Box:
+        """Start tracking from a known face box in a gray frame"""
+        self.box = tuple(int(v) for v in box)
+        self.confidence = 1.0
+        x, y, w, h = self.box
+        self.scale = min(1.0, self.template_width / max(w, 1))
+        self.template = cv2.resize(gray[y:y+h, x:x+w], None, fx=self.scale, fy=self.scale,
+                                   interpolation=cv2.INTER_AREA)
+        return self.box
+
+    def _detect(self, frame: np.ndarray, gray: np.ndarray) -> Optional[Box]:
+        self.detections += 1
+        self.frames_since_detection = 0
+        box = self.detector(frame)
+        if box is None:
+            self.reset()
+            return None
+        return self.seed(gray, box)
+
+    def _clamp(self, gray: np.ndarray, x: int, y: int, w: int, h: int) -> Box:
+        h_frame, w_frame = gray.shape[:2]
+        return (min(max(0, x), w_frame - w), min(max(0, y), h_frame - h), w, h)
+
+    def _track(self, gray: np.ndarray, margin: Optional[float] = None) -> Tuple[Box, float]:
+        x, y, w, h = self.box
+        h_frame, w_frame = gray.shape[:2]
+        margin = self.search_margin if margin is None else margin
+        margin_x = int(w * margin)
+        margin_y = int(h * margin)
+        x0, y0 = max(0, x - margin_x), max(0, y - margin_y)
+        x1, y1 = min(w_frame, x + w + margin_x), min(h_frame, y + h + margin_y)
+        window = cv2.resize(gray[y0:y1, x0:x1], None, fx=self.scale, fy=self.scale,
+                            interpolation=cv2.INTER_AREA)
+        t_h, t_w = self.template.shape[:2]
+        if window.shape[0] < t_h or window.shape[1] < t_w:
+            return self.box, 0.0
+        scores = cv2.matchTemplate(window, self.template, cv2.TM_CCOEFF_NORMED)
+        _, confidence, _, (match_x, match_y) = cv2.minMaxLoc(scores)
+        new_box = self._clamp(gray, x0 + int(round(match_x / self.scale)), y0 + int(round(match_y / self.scale)), w, h)
+        return new_box, float(confidence)
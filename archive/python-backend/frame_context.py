@@ -0,0 +1,94 @@
+"""
+Per-frame derived images for WesWorld FX
+One FrameContext is created per captured frame and handed through detection,
+tracking and filtering; gray, HSV, edge and pyramid images are computed on
+first use and then shared, so nothing is derived twice from the same frame
+"""
+import time
+from typing import Callable, Dict, Hashable, List
+
+import cv2
+import numpy as np
+
+
+_MISSING = object()
+
+
+class FrameContext:
+    """Lazily computed, memoized views of one BGR frame"""
+
+    def __init__(self, frame: np.ndarray, index: int = 0):
+        self.frame = frame
+        self.index = index
+        self.timestamp = time.monotonic()
+        self._images: Dict[Hashable, object] = {}
+
+    def memo(self, key: Hashable, compute: Callable[[], object]):
+        """Value stored under key for this frame, computing it on first request (None results are kept too)"""
+        # Detection may read the same context from its worker thread; a race only
+        # means one value is computed twice, never that a wrong one is returned
+        value = self._images.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._images[key] = compute()
+        return value
+
+    def gray(self) -> np.ndarray:
+        return self.memo('gray', lambda: cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY))
+
+    def hsv(self) -> np.ndarray:
+        return self.memo('hsv', lambda: cv2.cvtColor(self.frame, cv2.COLOR_BGR2HSV))
+
+    def rgb(self) -> np.ndarray:
+        return self.memo('rgb', lambda: cv2.cvtColor(self.frame, cv2.COLOR_BGR2RGB))
+
+    def scaled_rgb(self, scale: float) -> np.ndarray:
+        """RGB frame resized by scale with area averaging, converted after resizing"""
+        if scale >= 1.0:
+            return self.rgb()
+        return self.memo(('scaled_rgb', scale), lambda: cv2.cvtColor(
+            cv2.resize(self.frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2RGB))
+
+    def canny(self, low: float, high: float, color: bool = False) -> np.ndarray:
+        """Canny edges of the gray frame, or of the BGR frame itself with color=True"""
+        return self.memo(('canny', low, high, color),
+                         lambda: cv2.Canny(self.frame if color else self.gray(), low, high))
+
+    def blurred(self, ksize: int) -> np.ndarray:
+        """Gaussian blur of the BGR frame with a square kernel and automatic sigma"""
+        return self.memo(('blurred', ksize), lambda: cv2.GaussianBlur(self.frame, (ksize, ksize), 0))
+
+    def scaled_gray(self, scale: float) -> np.ndarray:
+        """
+        Gray frame resized by scale (the gray frame itself for scale >= 1). Scales of 1/4 and
+        below start from the gray pyramid level just above them, so only that small level is
+        area-averaged; a single halving is cheaper as a direct area resize
+        """
+        if scale >= 1.0:
+            return self.gray()
+        return self.memo(('scaled_gray', scale), lambda: self._scaled_gray(scale))
+
+    def _scaled_gray(self, scale: float) -> np.ndarray:
+        gray = self.gray()
+        depth = 0
+        while 0.5 ** (depth + 1) >= scale:
+            depth += 1
+        if depth < 2:
+            return cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        # Same output size as cv2.resize(gray, None, fx=scale, fy=scale)
+        size = (int(round(gray.shape[1] * scale)), int(round(gray.shape[0] * scale)))
+        level = self.pyramid(depth, gray=True)[depth]
+        if level.shape[1::-1] == size:
+            return level
+        return cv2.resize(level, size, interpolation=cv2.INTER_AREA)
+
+    def pyramid(self, levels: int, gray: bool = False) -> List[np.ndarray]:
+        """Gaussian pyramid [full, 1/2, 1/4, ...] with levels + 1 images; levels are built once and extended on demand"""
+        key = ('pyramid', gray)
+        pyramid = self._images.get(key) or [self.gray() if gray else self.frame]
+        if len(pyramid) <= levels:
+            # Extend a copy and swap it in whole, so readers never see a half-built list
+            pyramid = list(pyramid)
+            while len(pyramid) <= levels:
+                pyramid.append(cv2.pyrDown(pyramid[-1]))
+            self._images[key] = pyramid
+        return pyramid[:levels + 1]
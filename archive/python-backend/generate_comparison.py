@@ -3,6 +3,7 @@ import numpy as np
 import sys
 import os
 from face_filters import FaceFilter
+from mask_index import get_mask_index
 
 
 def create_test_face_image():
@@ -56,7 +57,8 @@ def capture_frame():
 
 
 def create_comparison(filter_type: str, original_frame: np.ndarray, output_path: str):
-    filter_app = FaceFilter()
+    # Float warp maps keep the comparison images bit-exact
+    filter_app = FaceFilter(fixed_point_maps=False)
     filter_app.__enter__()
     
     animated_filters = {
@@ -64,7 +66,7 @@ def create_comparison(filter_type: str, original_frame: np.ndarray, output_path:
     }
     
     full_image_filters = {
-        'bulge', 'stretch', 'swirl', 'fisheye', 'pinch', 'wave', 'mirror',
+        'ultimate_distortion', 'bulge', 'stretch', 'swirl', 'fisheye', 'pinch', 'wave', 'mirror',
         'twirl', 'ripple', 'sphere', 'tunnel', 'water_ripple', 'radial_blur',
         'cylinder', 'barrel', 'pincushion', 'whirlpool', 'radial_zoom',
         'concave', 'convex', 'spiral', 'radial_stretch', 'radial_compress',
@@ -82,30 +84,18 @@ def create_comparison(filter_type: str, original_frame: np.ndarray, output_path:
         'pixelate', 'blur', 'sharpen', 'emboss'
     }
     
-    # Face mask filters are handled dynamically
+    # Face mask filters (<folder>_face_mask_<name>) are resolved through the asset index
     try:
-        if 'face_mask' in filter_type:
-            # Parse filter name to extract folder and mask name
-            parts = filter_type.split('_')
-            if len(parts) >= 3:
-                folder = parts[0]
-                mask_name = parts[-1]
-                if folder == 'dropout':
-                    asset_dir = 'assets/dropout/face_mask'
-                elif folder == 'assets':
-                    asset_dir = 'assets/face_mask'
-                else:
-                    asset_dir = f'assets/{folder}/face_mask'
-                faces = filter_app.detect_all_faces(original_frame)
-                if faces:
-                    filtered_frame = original_frame.copy()
-                    for face in faces:
-                        filtered_frame = filter_app.apply_face_mask_from_asset(filtered_frame.copy(), face, mask_name, asset_dir=asset_dir)
-                else:
-                    print(f"Warning: No face detected for {filter_type} filter.")
-                    filtered_frame = original_frame.copy()
+        mask = get_mask_index(watch=False).get(filter_type)
+        if mask is not None:
+            faces, landmarks = filter_app.current_detections(original_frame)
+            if faces or landmarks:
+                filtered_frame = filter_app.apply_mask_entry(original_frame, mask, faces=faces, landmarks=landmarks)
             else:
+                print(f"Warning: No face detected for {filter_type} filter.")
                 filtered_frame = original_frame.copy()
+        elif 'face_mask' in filter_type:
+            filtered_frame = original_frame.copy()
         elif filter_type in animated_filters:
             dummy_face = (0, 0, original_frame.shape[1], original_frame.shape[0])
             filter_method = getattr(filter_app, f'apply_{filter_type}', None)
@@ -184,7 +174,7 @@ def create_comparison(filter_type: str, original_frame: np.ndarray, output_path:
 
 def get_all_filters():
     return [
-        'bulge', 'stretch', 'swirl', 'fisheye', 'pinch', 'wave', 'mirror',
+        'ultimate_distortion', 'bulge', 'stretch', 'swirl', 'fisheye', 'pinch', 'wave', 'mirror',
         'twirl', 'ripple', 'sphere', 'tunnel', 'water_ripple',
         'radial_blur', 'cylinder', 'barrel', 'pincushion', 'whirlpool',
         'radial_zoom', 'concave', 'convex', 'spiral', 'radial_stretch',
@@ -7,6 +7,8 @@ import time
 import threading
 from datetime import datetime
 from face_filters import FaceFilter
+import compositing
+from mask_index import get_mask_index
 from typing import Tuple, Optional, List, Dict
 try:
     from update_checker import UpdateChecker
@@ -78,11 +80,14 @@ class InteractiveFilterViewer:
         self.available_themes = ['wesworld', 'dropout', 'default']
         self.theme = self.load_theme()
         
+        # Face mask assets, indexed once and kept current by watchdog when it is installed
+        self.mask_index = get_mask_index()
+        
         # Filter categories (matching web UI)
         self.filter_categories = {
-            'DROPOUT': [],  # Face masks are discovered dynamically
+            'DROPOUT': self.mask_index.filter_ids(),  # Face masks are discovered by the mask index
             'Distortion': [
-                'bulge', 'stretch', 'swirl', 'fisheye', 'pinch', 'wave', 'mirror',
+                'ultimate_distortion', 'bulge', 'stretch', 'swirl', 'fisheye', 'pinch', 'wave', 'mirror',
                 'twirl', 'ripple', 'sphere', 'tunnel', 'water_ripple', 'radial_blur',
                 'cylinder', 'barrel', 'pincushion', 'whirlpool', 'radial_zoom',
                 'concave', 'convex', 'spiral', 'radial_stretch', 'radial_compress',
@@ -537,7 +542,7 @@ class InteractiveFilterViewer:
             print("="*50)
             raise RuntimeError("Could not access camera")
         
-        self.filter_app = FaceFilter(width=self.width, height=self.height, fps=self.fps)
+        self.filter_app = FaceFilter(width=self.width, height=self.height, fps=self.fps, streaming=True)
         self.filter_app.__enter__()
         
         return self
@@ -558,12 +563,16 @@ class InteractiveFilterViewer:
         if filter_type is None:
             return frame
         
+        # Detection and the filter share this frame's gray/HSV/edge images. Filters never
+        # modify their input, so the captured frame is passed to them without copying
+        self.filter_app.begin_frame(frame)
+        
         animated_filters = {
             'extreme_closeup', 'puzzle', 'fast_zoom_in', 'fast_zoom_out', 'shake', 'pulse', 'spiral_zoom'
         }
         
         full_image_filters = {
-            'bulge', 'stretch', 'swirl', 'fisheye', 'pinch', 'wave', 'mirror',
+            'ultimate_distortion', 'bulge', 'stretch', 'swirl', 'fisheye', 'pinch', 'wave', 'mirror',
             'twirl', 'ripple', 'sphere', 'tunnel', 'water_ripple', 'radial_blur',
             'cylinder', 'barrel', 'pincushion', 'whirlpool', 'radial_zoom',
             'concave', 'convex', 'spiral', 'radial_stretch', 'radial_compress',
@@ -581,42 +590,30 @@ class InteractiveFilterViewer:
             'pixelate', 'blur', 'sharpen', 'emboss'
         }
         
-        # Face mask filters are handled dynamically via apply_face_mask_from_asset
-        # Check if this is a face mask filter by checking if it contains 'face_mask'
+        # Face mask filters (<folder>_face_mask_<name>) are resolved through the asset index
         try:
-            if 'face_mask' in filter_type:
-                # Parse filter name to extract folder and mask name
-                parts = filter_type.split('_')
-                if len(parts) >= 3:
-                    folder = parts[0]
-                    mask_name = parts[-1]
-                    if folder == 'dropout':
-                        asset_dir = 'assets/dropout/face_mask'
-                    elif folder == 'assets':
-                        asset_dir = 'assets/face_mask'
-                    else:
-                        asset_dir = f'assets/{folder}/face_mask'
-                    faces = self.filter_app.detect_all_faces(frame)
-                    if faces:
-                        for face in faces:
-                            frame = self.filter_app.apply_face_mask_from_asset(frame.copy(), face, mask_name, asset_dir=asset_dir)
+            mask = self.mask_index.get(filter_type)
+            if mask is not None:
+                # Every face from one detection pass, composited in one pass
+                return self.filter_app.apply_mask_entry(frame, mask)
+            elif 'face_mask' in filter_type:
                 return frame
             elif filter_type in animated_filters:
                 dummy_face = (0, 0, frame.shape[1], frame.shape[0])
                 filter_method = getattr(self.filter_app, f'apply_{filter_type}', None)
                 if filter_method and callable(filter_method):
-                    return filter_method(frame.copy(), dummy_face, self.frame_count)
+                    return filter_method(frame, dummy_face, self.frame_count)
             elif filter_type in full_image_filters:
                 dummy_face = (0, 0, frame.shape[1], frame.shape[0])
                 filter_method = getattr(self.filter_app, f'apply_{filter_type}', None)
                 if filter_method and callable(filter_method):
-                    return filter_method(frame.copy(), dummy_face)
+                    return filter_method(frame, dummy_face)
             else:
-                face = self.filter_app.detect_face(frame)
+                face = self.filter_app.track_face(frame)
                 if face:
                     filter_method = getattr(self.filter_app, f'apply_{filter_type}', None)
                     if filter_method and callable(filter_method):
-                        return filter_method(frame.copy(), face)
+                        return filter_method(frame, face)
         except Exception as e:
             self.logger.error(f"Error applying filter {filter_type}: {e}", exception=str(e))
             print(f"Error applying filter {filter_type}: {e}")
@@ -697,12 +694,7 @@ class InteractiveFilterViewer:
         panel_height = min(panel_height, int(h * 0.85))  # Max 85% of screen height
         
         # Draw controls panel background with rounded corners
-        panel_roi = overlay[panel_y:panel_y+panel_height, panel_x:panel_x+panel_width]
-        if panel_roi.size > 0:
-            bg_overlay = np.full(panel_roi.shape, surface, dtype=np.uint8)
-            overlay[panel_y:panel_y+panel_height, panel_x:panel_x+panel_width] = cv2.addWeighted(
-                panel_roi, 1 - surface_alpha, bg_overlay, surface_alpha, 0
-            )
+        compositing.tint(overlay, panel_x, panel_y, panel_x+panel_width, panel_y+panel_height, surface, surface_alpha)
         
         # Draw rounded border
         self.draw_rounded_rect(overlay, (panel_x, panel_y), 
@@ -741,12 +733,7 @@ class InteractiveFilterViewer:
         # Draw search input box (like HTML input field)
         search_box_y1 = y_pos - int(line_height * 0.7)
         search_box_y2 = y_pos + int(line_height * 0.3)
-        search_box_bg = overlay[search_box_y1:search_box_y2, text_x:panel_x + panel_width - panel_padding]
-        if search_box_bg.size > 0:
-            input_bg = np.full(search_box_bg.shape, surface, dtype=np.uint8)
-            overlay[search_box_y1:search_box_y2, text_x:panel_x + panel_width - panel_padding] = cv2.addWeighted(
-                search_box_bg, 0.3, input_bg, 0.7, 0
-            )
+        compositing.tint(overlay, text_x, search_box_y1, panel_x + panel_width - panel_padding, search_box_y2, surface, 0.7)
         # Draw border around search box
         self.draw_rounded_rect(overlay, (text_x, search_box_y1), 
                              (panel_x + panel_width - panel_padding, search_box_y2),
@@ -793,12 +780,7 @@ class InteractiveFilterViewer:
                 button_width = panel_width - (panel_padding * 2)
                 
                 # Draw button background with accent color
-                button_bg_roi = overlay[button_y1:button_y2, text_x:text_x + button_width]
-                if button_bg_roi.size > 0:
-                    button_bg = np.full(button_bg_roi.shape, accent, dtype=np.uint8)
-                    overlay[button_y1:button_y2, text_x:text_x + button_width] = cv2.addWeighted(
-                        button_bg_roi, 0.2, button_bg, 0.8, 0
-                    )
+                compositing.tint(overlay, text_x, button_y1, text_x + button_width, button_y2, accent, 0.8)
                 
                 # Draw button border
                 self.draw_rounded_rect(overlay, (text_x, button_y1), 
@@ -829,12 +811,7 @@ class InteractiveFilterViewer:
         button_width = panel_width - (panel_padding * 2)
         
         # Draw button background
-        button_bg_roi = overlay[button_y1:button_y2, text_x:text_x + button_width]
-        if button_bg_roi.size > 0:
-            button_bg = np.full(button_bg_roi.shape, accent, dtype=np.uint8)
-            overlay[button_y1:button_y2, text_x:text_x + button_width] = cv2.addWeighted(
-                button_bg_roi, 0.1, button_bg, 0.9, 0
-            )
+        compositing.tint(overlay, text_x, button_y1, text_x + button_width, button_y2, accent, 0.9)
         
         # Draw button border
         self.draw_rounded_rect(overlay, (text_x, button_y1), 
@@ -864,12 +841,8 @@ class InteractiveFilterViewer:
                 # Category title (group header style)
                 cat_y1 = y_pos - int(line_height * 0.5)
                 cat_y2 = y_pos + int(line_height * 0.5)
-                cat_bg = overlay[cat_y1:cat_y2, text_x:panel_x + panel_width - panel_padding]
-                if cat_bg.size > 0:
-                    hover_bg = np.full(cat_bg.shape, tuple(self.theme['surfaceHover']), dtype=np.uint8)
-                    overlay[cat_y1:cat_y2, text_x:panel_x + panel_width - panel_padding] = cv2.addWeighted(
-                        cat_bg, 0.2, hover_bg, 0.8, 0
-                    )
+                compositing.tint(overlay, text_x, cat_y1, panel_x + panel_width - panel_padding, cat_y2,
+                                 tuple(self.theme['surfaceHover']), 0.8)
                 cv2.putText(overlay, 'DROPOUT', (text_x, y_pos), font, font_group, 
                            group_title, max(1, int(1.1 * scale_factor)))
                 y_pos += int(line_height * 1.0)
@@ -895,12 +868,7 @@ class InteractiveFilterViewer:
                     if is_active:
                         item_y1 = y_pos - int(line_height * 0.6)
                         item_y2 = y_pos + int(line_height * 0.4)
-                        item_bg = overlay[item_y1:item_y2, text_x:panel_x + panel_width - panel_padding]
-                        if item_bg.size > 0:
-                            accent_bg = np.full(item_bg.shape, accent, dtype=np.uint8)
-                            overlay[item_y1:item_y2, text_x:panel_x + panel_width - panel_padding] = cv2.addWeighted(
-                                item_bg, 0.3, accent_bg, 0.7, 0
-                            )
+                        compositing.tint(overlay, text_x, item_y1, panel_x + panel_width - panel_padding, item_y2, accent, 0.7)
                     color = tuple(self.theme['selectedText']) if is_active else text
                     cv2.putText(overlay, name, (text_x, y_pos), font, font_small, 
                                color, max(1, int(1.1 * scale_factor) if is_active else int(scale_factor)))
@@ -916,12 +884,8 @@ class InteractiveFilterViewer:
             # Category title
             cat_y1 = y_pos - int(line_height * 0.5)
             cat_y2 = y_pos + int(line_height * 0.5)
-            cat_bg = overlay[cat_y1:cat_y2, text_x:panel_x + panel_width - panel_padding]
-            if cat_bg.size > 0:
-                hover_bg = np.full(cat_bg.shape, tuple(self.theme['surfaceHover']), dtype=np.uint8)
-                overlay[cat_y1:cat_y2, text_x:panel_x + panel_width - panel_padding] = cv2.addWeighted(
-                    cat_bg, 0.2, hover_bg, 0.8, 0
-                )
+            compositing.tint(overlay, text_x, cat_y1, panel_x + panel_width - panel_padding, cat_y2,
+                             tuple(self.theme['surfaceHover']), 0.8)
             cv2.putText(overlay, category.upper(), (text_x, y_pos), font, font_group, 
                        group_title, max(1, int(1.1 * scale_factor)))
             y_pos += int(line_height * 1.0)
@@ -947,12 +911,7 @@ class InteractiveFilterViewer:
                 if is_active:
                     item_y1 = y_pos - int(line_height * 0.6)
                     item_y2 = y_pos + int(line_height * 0.4)
-                    item_bg = overlay[item_y1:item_y2, text_x:panel_x + panel_width - panel_padding]
-                    if item_bg.size > 0:
-                        accent_bg = np.full(item_bg.shape, accent, dtype=np.uint8)
-                        overlay[item_y1:item_y2, text_x:panel_x + panel_width - panel_padding] = cv2.addWeighted(
-                            item_bg, 0.3, accent_bg, 0.7, 0
-                        )
+                    compositing.tint(overlay, text_x, item_y1, panel_x + panel_width - panel_padding, item_y2, accent, 0.7)
                 
                 color = tuple(self.theme['selectedText']) if is_active else text
                 cv2.putText(overlay, name, (text_x, y_pos), font, font_small, 
@@ -975,12 +934,7 @@ class InteractiveFilterViewer:
         status_height = int(30 * scale_factor)
         
         # Draw status background
-        status_roi = overlay[status_y_pos:status_y_pos+status_height, status_x:status_x+status_width]
-        if status_roi.size > 0:
-            status_bg = np.full(status_roi.shape, surface, dtype=np.uint8)
-            overlay[status_y_pos:status_y_pos+status_height, status_x:status_x+status_width] = cv2.addWeighted(
-                status_roi, 1 - surface_alpha, status_bg, surface_alpha, 0
-            )
+        compositing.tint(overlay, status_x, status_y_pos, status_x+status_width, status_y_pos+status_height, surface, surface_alpha)
         
         # Draw status border with accent color
         self.draw_rounded_rect(overlay, (status_x, status_y_pos), 
@@ -0,0 +1,165 @@
+"""
+Face mask asset cache for WesWorld FX
+Each PNG is decoded once into BGR and a normalized alpha plane and kept in memory,
+or mapped straight from the precompiled mask store when that is up to date;
+its mtime is rechecked at most once per interval, so edited assets still reload.
+Resized variants are cached per quantized size as premultiplied layers, built from
+a mip pyramid whose levels also serve warps that scale while they rotate
+"""
+import math
+import os
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from cache_manager import CacheManager, estimate_nbytes, get_cache_manager
+from compositing import Layer, premultiply
+from mask_store import MaskStore, split_mask_image
+
+
+class MaskAsset(NamedTuple):
+    """A decoded mask image: uint8 BGR plus float32 alpha in [0, 1] (None if fully opaque)"""
+    bgr: np.ndarray
+    alpha: Optional[np.ndarray]
+    path: str
+    mtime: float
+
+
+def decode_mask_asset(path: str, mtime: float) -> Optional[MaskAsset]:
+    image = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+    if image is None:
+        return None
+    bgr, alpha = split_mask_image(image)
+    return _read_only(MaskAsset(bgr, alpha, path, mtime))
+
+
+def _read_only(asset: MaskAsset) -> MaskAsset:
+    asset.bgr.setflags(write=False)
+    if asset.alpha is not None:
+        asset.alpha.setflags(write=False)
+    return asset
+
+
+class MaskAssetCache:
+    """Decoded mask assets by path, kept in the cache manager and revalidated by mtime"""
+
+    def __init__(self, cache_manager: Optional[CacheManager] = None, revalidate_interval: float = 1.0,
+                 scale_step: float = 0.02, max_scaled: int = 32, store: Optional[MaskStore] = None):
+        cache_manager = cache_manager or get_cache_manager()
+        # Precompiled, memory-mapped masks (see mask_store), used instead of decoding when up to date
+        self.store = store
+        self.assets = cache_manager.namespace('mask_assets', max_entries=64)
+        self.pyramids = cache_manager.namespace('mask_pyramids', max_entries=64)
+        self.scaled_variants = cache_manager.namespace('mask_scales', max_entries=max_scaled)
+        self.levels = cache_manager.namespace('mask_levels', max_entries=64)
+        # Seconds between mtime checks of a cached asset
+        self.revalidate_interval = revalidate_interval
+        # Requested mask sizes snap to geometric buckets this far apart (0.02 = 2%)
+        self.scale_step = scale_step
+        self._checked: Dict[str, float] = {}
+        self.loads = 0
+
+    def get(self, path: str) -> Optional[MaskAsset]:
+        """The decoded asset, touching the filesystem only when its revalidation is due"""
+        asset = self.assets.get(path)
+        now = time.monotonic()
+        if asset is not None and now - self._checked.get(path, 0.0) < self.revalidate_interval:
+            return asset
+        self._checked[path] = now
+
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            print(f"Warning: Asset not found at {path}")
+            return None
+        if asset is not None and asset.mtime == mtime:
+            return asset
+
+        stored = self.store.get(path, mtime) if self.store is not None else None
+        if stored is not None:
+            # Mapped pages are shared and not owned by this process, so they do not count against the cache budget
+            return self.assets.put(path, MaskAsset(stored[0], stored[1], path, mtime), nbytes=0)
+
+        asset = decode_mask_asset(path, mtime)
+        if asset is None:
+            print(f"Warning: Failed to load asset image from {path}")
+            return None
+        self.loads += 1
+        print(f"Loaded asset: {os.path.basename(path)} from {os.path.dirname(path)} (size: {asset.bgr.shape[:2]})")
+        return self.assets.put(path, asset)
+
+    def bucket_size(self, asset: MaskAsset, width: int, height: int) -> Tuple[int, int]:
+        """Snap a requested mask size to the nearest scale bucket of the asset"""
+        src_h, src_w = asset.bgr.shape[:2]
+        step = math.log1p(self.scale_step)
+        def snap(size, src):
+            return max(1, int(round(src * math.exp(round(math.log(max(size, 1) / src) / step) * step))))
+        return snap(width, src_w), snap(height, src_h)
+
+    def scaled(self, asset: MaskAsset, width: int, height: int) -> Layer:
+        """
+        The asset resized to the bucket nearest (width, height) as a premultiplied layer;
+        check layer.shape for the actual size. Layers are shared and read-only
+        """
+        width, height = self.bucket_size(asset, width, height)
+        key = (asset.path, asset.mtime, width, height)
+        layer = self.scaled_variants.get(key)
+        if layer is None:
+            bgr, alpha = self._pyramid_level(asset, width, height)
+            interpolation = cv2.INTER_AREA if width < bgr.shape[1] else cv2.INTER_LINEAR
+            bgr = cv2.resize(bgr, (width, height), interpolation=interpolation)
+            if alpha is not None:
+                alpha = cv2.resize(alpha, (width, height), interpolation=interpolation)
+            layer = premultiply(bgr, alpha)
+            for plane in layer:
+                if plane is not None:
+                    plane.setflags(write=False)
+            layer = self.scaled_variants.put(key, layer)
+        return layer
+
+    def level(self, asset: MaskAsset, width: int, height: int) -> Layer:
+        """
+        The smallest pyramid level at least (width, height) as a premultiplied layer, for
+        callers that scale it to the final size within their own warp. Shared and read-only
+        """
+        bgr, alpha = self._pyramid_level(asset, width, height)
+        key = (asset.path, asset.mtime, bgr.shape)
+        layer = self.levels.get(key)
+        if layer is None:
+            layer = premultiply(bgr, alpha)
+            for plane in layer[1:]:
+                if plane is not None:
+                    plane.setflags(write=False)
+            layer = self.levels.put(key, layer, nbytes=estimate_nbytes(layer[1:]))
+        return layer
+
+    def _pyramid_level(self, asset: MaskAsset, width: int, height: int) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        # The smallest pyramid level still at least as large as the target in both dimensions
+        src_h, src_w = asset.bgr.shape[:2]
+        depth = 0
+        while (src_w >> (depth + 1)) >= width and (src_h >> (depth + 1)) >= height:
+            depth += 1
+        key = (asset.path, asset.mtime)
+        levels: List[Tuple[np.ndarray, Optional[np.ndarray]]] = self.pyramids.get(key) or [(asset.bgr, asset.alpha)]
+        if len(levels) <= depth:
+            # Extend a copy and swap it in whole, so readers never see a half-built list
+            levels = list(levels)
+            while len(levels) <= depth:
+                bgr, alpha = levels[-1]
+                levels.append((cv2.pyrDown(bgr), cv2.pyrDown(alpha) if alpha is not None else None))
+            # Level 0 is the asset itself and is already counted in the asset namespace
+            self.pyramids.put(key, levels, nbytes=estimate_nbytes(levels[1:]))
+        return levels[depth]
+
+
+# Global asset cache shared by every FaceFilter and connection
+_mask_assets = None
+
+def get_mask_assets() -> MaskAssetCache:
+    """Get or create the process-wide mask asset cache"""
+    global _mask_assets
+    if _mask_assets is None:
+        _mask_assets = MaskAssetCache(store=MaskStore())
+    return _mask_assets
@@ -0,0 +1,224 @@
+"""
+Face mask asset index for WesWorld FX
+Scans assets/<folder>/face_mask/*.png once and maps each filter id
+(<folder>_face_mask_<name>) to its asset, so the per-frame path is one dict lookup;
+a watchdog observer, when available, keeps the index current as masks change
+"""
+import json
+import os
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from mask_assets import MaskAsset, get_mask_assets
+from mask_store import ASSET_ROOT
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+
+FACE_MASK_TYPE = 'face_mask'
+# Masks directly under assets/face_mask/ belong to this folder name in filter ids
+ROOT_FOLDER = 'assets'
+# Optional per-folder metadata: {"<name>": {"eye_anchor": [x, y]}}, fractions of the mask size
+MANIFEST_FILE = 'manifest.json'
+# Where the eye center sits in a mask unless its manifest says otherwise
+DEFAULT_EYE_ANCHOR = (0.5, 0.35)
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+class MaskEntry(NamedTuple):
+    """One face mask asset as the filters use it"""
+    filter_id: str
+    name: str
+    folder: str
+    # Directory relative to python-backend, as FaceFilter.apply_face_masks takes it
+    asset_dir: str
+    path: str
+    width: int
+    height: int
+    eye_anchor: Tuple[float, float]
+
+    def load(self) -> Optional[MaskAsset]:
+        """The decoded asset, from the shared asset cache"""
+        return get_mask_assets().get(self.path)
+
+
+def mask_filter_id(folder: str, name: str) -> str:
+    return f'{folder}_{FACE_MASK_TYPE}_{name}'
+
+
+def png_size(path: str) -> Optional[Tuple[int, int]]:
+    """(width, height) from a PNG header, without decoding the image"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(24)
+    except OSError:
+        return None
+    if len(header) < 24 or not header.startswith(_PNG_SIGNATURE) or header[12:16] != b'IHDR':
+        return None
+    return int.from_bytes(header[16:20], 'big'), int.from_bytes(header[20:24], 'big')
+
+
+class MaskIndex:
+    """Filter id -> MaskEntry for every face mask under an asset root"""
+
+    def __init__(self, root: str = ASSET_ROOT):
+        self.root = root
+        self.entries: Dict[str, MaskEntry] = {}
+        self._lock = threading.Lock()
+        self.observer = None
+        self._warned = False
+        self.refresh()
+
+    def get(self, filter_id: str) -> Optional[MaskEntry]:
+        return self.entries.get(filter_id)
+
+    def filter_ids(self, folder: Optional[str] = None) -> List[str]:
+        """Sorted filter ids, optionally only those of one asset folder"""
+        return sorted(entry.filter_id for entry in list(self.entries.values())
+                      if folder is None or entry.folder == folder)
+
+    def refresh(self):
+        """Rescan every face_mask directory under the root"""
+        entries = {}
+        for folder, mask_dir in self._mask_dirs():
+            entries.update(self._scan_folder(folder, mask_dir))
+        with self._lock:
+            self.entries = entries
+
+    def watch(self) -> bool:
+        """
+        Keep the index current with a watchdog observer. Without watchdog (an optional
+        dependency) this returns False and the index only changes on refresh()
+        """
+        if not WATCHDOG_AVAILABLE:
+            if not self._warned:
+                print("Warning: watchdog is not installed; new or edited masks need a restart or refresh()")
+                self._warned = True
+            return False
+        if self.observer is not None or not os.path.isdir(self.root):
+            return False
+        self.observer = Observer()
+        self.observer.schedule(_MaskEventHandler(self), self.root, recursive=True)
+        self.observer.daemon = True
+        self.observer.start()
+        return True
+
+    def stop(self):
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join(timeout=1.0)
+            self.observer = None
+
+    def _mask_dirs(self) -> List[Tuple[str, str]]:
+        dirs = []
+        if os.path.isdir(os.path.join(self.root, FACE_MASK_TYPE)):
+            dirs.append((ROOT_FOLDER, os.path.join(self.root, FACE_MASK_TYPE)))
+        if os.path.isdir(self.root):
+            for item in os.scandir(self.root):
+                mask_dir = os.path.join(item.path, FACE_MASK_TYPE)
+                if item.is_dir() and item.name != FACE_MASK_TYPE and os.path.isdir(mask_dir):
+                    dirs.append((item.name, mask_dir))
+        return dirs
+
+    def _scan_folder(self, folder: str, mask_dir: str) -> Dict[str, MaskEntry]:
+        anchors = self._load_manifest(mask_dir)
+        entries = {}
+        for item in os.scandir(mask_dir):
+            if item.is_file() and item.name.lower().endswith('.png'):
+                entry = self._entry(folder, mask_dir, item.path, anchors)
+                if entry is not None:
+                    entries[entry.filter_id] = entry
+        return entries
+
+    def _entry(self, folder: str, mask_dir: str, path: str,
+               anchors: Dict[str, Tuple[float, float]]) -> Optional[MaskEntry]:
+        size = png_size(path)
+        if size is None:
+            return None
+        name = os.path.splitext(os.path.basename(path))[0]
+        asset_dir = os.path.relpath(mask_dir, os.path.dirname(os.path.abspath(__file__)))
+        return MaskEntry(mask_filter_id(folder, name), name, folder, asset_dir, path, size[0], size[1],
+                         anchors.get(name, DEFAULT_EYE_ANCHOR))
+
+    @staticmethod
+    def _load_manifest(mask_dir: str) -> Dict[str, Tuple[float, float]]:
+        try:
+            with open(os.path.join(mask_dir, MANIFEST_FILE), 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {name: tuple(meta['eye_anchor']) for name, meta in manifest.items()
+                if isinstance(meta, dict) and 'eye_anchor' in meta}
+
+    def _folder_of(self, mask_dir: str) -> Optional[str]:
+        parent = os.path.dirname(mask_dir)
+        if os.path.basename(mask_dir) != FACE_MASK_TYPE:
+            return None
+        if os.path.abspath(parent) == os.path.abspath(self.root):
+            return ROOT_FOLDER
+        if os.path.abspath(os.path.dirname(parent)) == os.path.abspath(self.root):
+            return os.path.basename(parent)
+        return None
+
+    def _on_change(self, path: str):
+        # A changed PNG updates its own entry; a changed manifest rescans its folder
+        mask_dir = os.path.dirname(path)
+        folder = self._folder_of(mask_dir)
+        if folder is None:
+            return
+        if os.path.basename(path) == MANIFEST_FILE:
+            entries = self._scan_folder(folder, mask_dir) if os.path.isdir(mask_dir) else {}
+            with self._lock:
+                kept = {key: entry for key, entry in self.entries.items() if entry.folder != folder}
+                kept.update(entries)
+                self.entries = kept
+            return
+        if not path.lower().endswith('.png'):
+            return
+        name = os.path.splitext(os.path.basename(path))[0]
+        filter_id = mask_filter_id(folder, name)
+        entry = self._entry(folder, mask_dir, path, self._load_manifest(mask_dir)) if os.path.exists(path) else None
+        with self._lock:
+            if entry is None:
+                self.entries.pop(filter_id, None)
+            else:
+                self.entries[filter_id] = entry
+
+
+if WATCHDOG_AVAILABLE:
+    class _MaskEventHandler(FileSystemEventHandler):
+        """Forwards file events under the asset root to the index"""
+
+        def __init__(self, index: MaskIndex):
+            super().__init__()
+            self.index = index
+
+        def on_any_event(self, event):
+            if event.event_type in ('opened', 'closed_no_write'):
+                return
+            if event.is_directory:
+                if event.event_type in ('created', 'deleted', 'moved'):
+                    self.index.refresh()
+                return
+            self.index._on_change(event.src_path)
+            if getattr(event, 'dest_path', None):
+                self.index._on_change(event.dest_path)
+
+
+# Global mask index shared by every FaceFilter and connection
+_mask_index = None
+
+def get_mask_index(watch: bool = True) -> MaskIndex:
+    """Get or create the process-wide mask index, watching the asset root for changes if asked"""
+    global _mask_index
+    if _mask_index is None:
+        _mask_index = MaskIndex()
+    if watch:
+        _mask_index.watch()
+    return _mask_index
@@ -0,0 +1,116 @@
+"""
+Precompiled face mask store for WesWorld FX
+A build step packs every decoded mask (BGR plus float32 alpha) into one .npy file with
+a JSON index; at run time the pack is memory-mapped, so masks need no decoding and the
+OS page cache shares their pixels across processes
+"""
+import json
+import os
+import shutil
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+ASSET_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mask_store')
+PACK_FILE = 'masks.npy'
+INDEX_FILE = 'index.json'
+# Planes start on cache-line boundaries so the float32 alpha views are aligned
+_ALIGN = 64
+
+
+class StoredMask(NamedTuple):
+    """Where one mask's planes live in the pack, and the source file they were built from"""
+    offset: int
+    height: int
+    width: int
+    has_alpha: bool
+    mtime: float
+
+
+def split_mask_image(image: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Contiguous uint8 BGR and float32 alpha in [0, 1] (None without an alpha channel) of a decoded PNG"""
+    if image.ndim == 2:
+        image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    alpha = None
+    if image.shape[2] == 4:
+        alpha = image[:, :, 3].astype(np.float32) * np.float32(1 / 255.0)
+    return np.ascontiguousarray(image[:, :, :3]), alpha
+
+
+def _aligned(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _plane_sizes(height: int, width: int, has_alpha: bool) -> Tuple[int, int]:
+    return _aligned(height * width * 3), _aligned(height * width * 4) if has_alpha else 0
+
+
+def build_mask_store(paths: Iterable[str], asset_root: str = ASSET_ROOT, store_dir: str = STORE_DIR) -> int:
+    """Decode the given PNGs into a new pack and index in store_dir; returns the number of masks stored"""
+    os.makedirs(store_dir, exist_ok=True)
+    pack_path = os.path.join(store_dir, PACK_FILE)
+    index_path = os.path.join(store_dir, INDEX_FILE)
+    layout: Dict[str, StoredMask] = {}
+    offset = 0
+    # Planes are streamed to a raw file one mask at a time, so large libraries never sit in memory
+    with open(pack_path + '.raw.tmp', 'wb') as raw:
+        for path in sorted(paths):
+            image = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+            if image is None:
+                print(f"Warning: Failed to load asset image from {path}")
+                continue
+            bgr, alpha = split_mask_image(image)
+            height, width = bgr.shape[:2]
+            bgr_size, alpha_size = _plane_sizes(height, width, alpha is not None)
+            raw.write(bgr.tobytes().ljust(bgr_size, b'\0'))
+            if alpha is not None:
+                raw.write(alpha.tobytes().ljust(alpha_size, b'\0'))
+            layout[os.path.relpath(os.path.abspath(path), asset_root)] = StoredMask(
+                offset, height, width, alpha is not None, os.path.getmtime(path))
+            offset += bgr_size + alpha_size
+
+    # Written under temporary names and renamed, so running servers keep their old mapping intact
+    with open(pack_path + '.tmp', 'wb') as pack, open(pack_path + '.raw.tmp', 'rb') as raw:
+        np.lib.format.write_array_header_1_0(pack, {'descr': '|u1', 'fortran_order': False, 'shape': (offset,)})
+        shutil.copyfileobj(raw, pack, 1 << 20)
+    os.remove(pack_path + '.raw.tmp')
+    with open(index_path + '.tmp', 'w') as f:
+        json.dump({key: entry._asdict() for key, entry in layout.items()}, f, indent=1)
+    os.replace(pack_path + '.tmp', pack_path)
+    os.replace(index_path + '.tmp', index_path)
+    return len(layout)
+
+
+class MaskStore:
+    """Read-only, memory-mapped view of a built store; `available` is False when none was built"""
+
+    def __init__(self, asset_root: str = ASSET_ROOT, store_dir: str = STORE_DIR):
+        self.asset_root = asset_root
+        self.entries: Dict[str, StoredMask] = {}
+        self.pack = None
+        try:
+            with open(os.path.join(store_dir, INDEX_FILE), 'r') as f:
+                self.entries = {key: StoredMask(**entry) for key, entry in json.load(f).items()}
+            self.pack = np.load(os.path.join(store_dir, PACK_FILE), mmap_mode='r')
+        except (OSError, ValueError, TypeError):
+            self.entries = {}
+        self.available = self.pack is not None and bool(self.entries)
+
+    def get(self, path: str, mtime: float) -> Optional[Tuple[np.ndarray, Optional[np.ndarray]]]:
+        """Memory-mapped (bgr, alpha) of a mask, or None if it is not stored or its file changed since the build"""
+        if not self.available:
+            return None
+        entry = self.entries.get(os.path.relpath(os.path.abspath(path), self.asset_root))
+        if entry is None or entry.mtime != mtime:
+            return None
+        bgr_size, alpha_size = _plane_sizes(entry.height, entry.width, entry.has_alpha)
+        start = entry.offset
+        bgr = self.pack[start:start + entry.height * entry.width * 3].reshape(entry.height, entry.width, 3)
+        alpha = None
+        if entry.has_alpha:
+            alpha = self.pack[start + bgr_size:start + bgr_size + alpha_size].view(np.float32)
+            alpha = alpha[:entry.height * entry.width].reshape(entry.height, entry.width)
+        return bgr, alpha
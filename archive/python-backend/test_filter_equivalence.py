@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Output checks for filters that were compiled into faster forms: each compiled
+filter must match the step-by-step path it replaces
+"""
+import cv2
+import numpy as np
+import pytest
+
+import color_luts
+from face_filters import FaceFilter
+
+
+@pytest.fixture(scope="module")
+def face_filter():
+    return FaceFilter(face_detector='haar')
+
+
+def smooth_frame(width=640, height=360):
+    """Low-frequency test pattern, so resampling differences stay below one level"""
+    ys, xs = np.mgrid[0:height, 0:width].astype(np.float32)
+    return np.dstack([128 + 100 * np.sin(xs / 40), 128 + 100 * np.cos(ys / 35),
+                      128 + 90 * np.sin((xs + ys) / 50)]).astype(np.uint8)
+
+
+def every_color():
+    """All 2^24 BGR colors as one 4096 x 4096 image"""
+    return np.arange(1 << 24, dtype=np.uint32).view(np.uint8).reshape(4096, 4096, 4)[:, :, :3].copy()
+
+
+def float_sepia(frame):
+    """The float matrix path sepia used before it was compiled"""
+    result = cv2.transform(frame.astype(np.float32), np.array(color_luts.SEPIA_MATRIX))
+    return np.clip(result, 0, 255).astype(np.uint8)
+
+
+def max_diff(a, b):
+    return int(np.abs(a.astype(np.int16) - b).max())
+
+
+def test_sepia_matches_float_path(face_filter):
+    frame = every_color()
+    assert max_diff(face_filter.apply_sepia(frame, None), float_sepia(frame)) <= 1
+
+
+@pytest.mark.parametrize('name, finish', [
+    ('vintage', lambda f, frame: cv2.add(frame, np.random.randint(0, 50, frame.shape, dtype=np.uint8))),
+    ('retro', lambda f, frame: f.apply_vhs(frame, None)),
+])
+def test_sepia_looks_match_float_path(face_filter, name, finish):
+    # Both paths draw the same noise from the same seed
+    frame = smooth_frame()
+    np.random.seed(7)
+    compiled = getattr(face_filter, f'apply_{name}')(frame, None)
+    np.random.seed(7)
+    reference = finish(face_filter, float_sepia(frame))
+    assert max_diff(compiled, reference) <= 1
+
+
+def test_warp_chain_matches_sequential_warps(face_filter):
+    frame = smooth_frame()
+    chained = face_filter.apply_ultimate_distortion(frame, None)
+    sequential = frame
+    for name in FaceFilter.ULTIMATE_DISTORTION_CHAIN:
+        sequential = getattr(face_filter, f'apply_{name}')(sequential, None)
+    diff = np.abs(chained.astype(np.int16) - sequential)
+    # One resample instead of three: only interpolation rounding may differ
+    assert diff.max() <= 2
+    assert diff.mean() < 0.5
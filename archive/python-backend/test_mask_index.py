@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Checks that the face mask index works without watchdog, which is optional:
+watch() reports it cannot watch and refresh() still picks up new masks
+"""
+import cv2
+import numpy as np
+
+import mask_index
+from mask_index import MaskIndex, mask_filter_id
+
+
+def write_mask(path, width=40, height=30):
+    cv2.imwrite(str(path), np.zeros((height, width, 4), dtype=np.uint8))
+
+
+def test_index_without_watchdog(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(mask_index, 'WATCHDOG_AVAILABLE', False)
+    mask_dir = tmp_path / 'dropout' / 'face_mask'
+    mask_dir.mkdir(parents=True)
+    write_mask(mask_dir / 'sam.png')
+
+    index = MaskIndex(str(tmp_path))
+    entry = index.get(mask_filter_id('dropout', 'sam'))
+    assert entry is not None and (entry.width, entry.height) == (40, 30)
+
+    assert index.watch() is False
+    assert index.observer is None
+    assert 'watchdog is not installed' in capsys.readouterr().out
+    # The warning is printed once per index
+    index.watch()
+    assert capsys.readouterr().out == ''
+
+    write_mask(mask_dir / 'wes.png')
+    assert index.get(mask_filter_id('dropout', 'wes')) is None
+    index.refresh()
+    assert index.filter_ids('dropout') == [mask_filter_id('dropout', 'sam'), mask_filter_id('dropout', 'wes')]
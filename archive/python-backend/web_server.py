@@ -9,6 +9,8 @@ from fastapi.staticfiles import StaticFiles
 import os
 from typing import Optional
 from face_filters import FaceFilter
+from cache_manager import get_cache_manager
+from mask_index import get_mask_index
 import time
 from collections import deque
 
@@ -17,13 +19,17 @@ app = FastAPI()
 # Store active connections and their filter state
 active_connections = {}
 
+# Face mask assets, indexed once at startup and kept current by watchdog when it is installed
+mask_index = get_mask_index()
+
 # Get all available filters organized by category
 def get_all_filters():
     return [
         # DROPOUT
-        # Face masks are discovered dynamically from assets/dropout/face_mask/
+        # Face masks, discovered from assets/<folder>/face_mask/ by the mask index
+        *mask_index.filter_ids(),
         # Distortion
-        'bulge', 'stretch', 'swirl', 'fisheye', 'pinch', 'wave', 'mirror',
+        'ultimate_distortion', 'bulge', 'stretch', 'swirl', 'fisheye', 'pinch', 'wave', 'mirror',
         'twirl', 'ripple', 'sphere', 'tunnel', 'water_ripple',
         'radial_blur', 'cylinder', 'barrel', 'pincushion', 'whirlpool', 'radial_zoom',
         'concave', 'convex', 'spiral', 'radial_stretch', 'radial_compress',
@@ -46,8 +52,8 @@ def get_all_filters():
 # Get filters organized by category for UI grouping
 def get_filters_by_category():
     return {
-        'DROPOUT': [],  # Face masks are discovered dynamically
-        'Distortion': ['bulge', 'stretch', 'swirl', 'fisheye', 'pinch', 'wave', 'mirror',
+        'DROPOUT': mask_index.filter_ids(),  # Face masks are discovered by the mask index
+        'Distortion': ['ultimate_distortion', 'bulge', 'stretch', 'swirl', 'fisheye', 'pinch', 'wave', 'mirror',
                       'twirl', 'ripple', 'sphere', 'tunnel', 'water_ripple',
                       'radial_blur', 'cylinder', 'barrel', 'pincushion', 'whirlpool', 'radial_zoom',
                       'concave', 'convex', 'spiral', 'radial_stretch', 'radial_compress',
@@ -149,6 +155,21 @@ async def get_filters_categories():
     categories = get_filters_by_category()
     return {"categories": categories}
 
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Get memory use and hit/miss/eviction counters of the shared filter caches"""
+    return get_cache_manager().stats()
+
+@app.get("/api/detection/stats")
+async def get_detection_stats():
+    """Get face detection ROI hit/miss counters summed over active connections"""
+    totals = {}
+    for conn in active_connections.values():
+        if conn['filter_app'] is not None:
+            for name, value in conn['filter_app'].get_detection_stats().items():
+                totals[name] = totals.get(name, 0) + value
+    return {"connections": len(active_connections), "stats": totals}
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
@@ -166,7 +187,8 @@ async def websocket_endpoint(websocket: WebSocket):
     
     # Initialize filter app (without camera, just for processing)
     try:
-        filter_app = FaceFilter()
+        # Each connection streams consecutive frames of one video
+        filter_app = FaceFilter(streaming=True)
         # Don't call __enter__ since we're not using the camera
         active_connections[connection_id]['filter_app'] = filter_app
     except Exception as e:
@@ -240,6 +262,9 @@ async def websocket_endpoint(websocket: WebSocket):
                         filter_name = conn.get('filter')
                         filter_app = conn['filter_app']
                         frame_count = conn['frame_count']
+                        # One set of derived images (gray, HSV, edges) per decoded frame; filters
+                        # do not modify their input, so frames are passed without copying
+                        filter_app.begin_frame(frame)
                         
                         if filter_name:
                             # Debug logging
@@ -251,7 +276,7 @@ async def websocket_endpoint(websocket: WebSocket):
                             }
                             
                             full_image_filters = {
-                                'bulge', 'stretch', 'swirl', 'fisheye', 'pinch', 'wave', 'mirror',
+                                'ultimate_distortion', 'bulge', 'stretch', 'swirl', 'fisheye', 'pinch', 'wave', 'mirror',
                                 'twirl', 'ripple', 'sphere', 'tunnel', 'water_ripple', 'radial_blur',
                                 'cylinder', 'barrel', 'pincushion', 'whirlpool', 'radial_zoom',
                                 'concave', 'convex', 'spiral', 'radial_stretch', 'radial_compress',
@@ -269,63 +294,38 @@ async def websocket_endpoint(websocket: WebSocket):
                                 'pixelate', 'blur', 'sharpen', 'emboss'
                             }
                             
-                            # Parse hierarchical filter names: <assets_folder>_<fx_type>_<fx_option>
-                            # Example: dropout_face_mask_<name> -> folder: dropout, type: face_mask, option: <name>
-                            def parse_filter_name(filter_name):
-                                """Parse hierarchical filter name into components"""
-                                parts = filter_name.split('_')
-                                if len(parts) >= 3:
-                                    # Format: <folder>_<type>_<option>
-                                    folder = parts[0]
-                                    fx_type = '_'.join(parts[1:-1])  # Handle multi-word types
-                                    option = parts[-1]
-                                    return folder, fx_type, option
-                                return None, None, None
-                            
                             try:
-                                # Check if this is a face mask filter dynamically
-                                if 'face_mask' in filter_name:
-                                    folder, fx_type, option = parse_filter_name(filter_name)
-                                    if folder and fx_type == 'face_mask' and option:
-                                        # Map to asset directory based on hierarchical structure
-                                        # Format: <folder>_<fx_type>_<option> -> assets/<folder>/<fx_type>/<option>.png
-                                        if folder == 'dropout':
-                                            asset_dir = 'assets/dropout/face_mask'
-                                        elif folder == 'assets':
-                                            asset_dir = 'assets/face_mask'
-                                        else:
-                                            asset_dir = f'assets/{folder}/face_mask'
-                                        
-                                        # Use dynamic asset loading - same processing for all face masks
-                                        print(f"[FILTER DEBUG] Applying face mask: filter='{filter_name}' -> asset='{option}', dir='{asset_dir}'")
-                                        faces = filter_app.detect_all_faces(frame)
-                                        if faces and len(faces) > 0:
-                                            print(f"[FILTER DEBUG] Found {len(faces)} face(s), applying mask '{option}' from '{asset_dir}'...")
-                                            # Apply mask to all detected faces
-                                            for face in faces:
-                                                frame = filter_app.apply_face_mask_from_asset(frame.copy(), face, option, asset_dir=asset_dir)
-                                            print(f"[FILTER DEBUG] Face mask '{option}' applied successfully for filter: {filter_name}")
-                                        else:
-                                            print(f"[FILTER DEBUG] No faces detected for filter: {filter_name}")
-                                        else:
-                                            print(f"[FILTER DEBUG] Could not parse face mask filter name: {filter_name}")
+                                # Face masks: <folder>_face_mask_<name>, resolved through the asset index
+                                mask = mask_index.get(filter_name)
+                                if mask is not None:
+                                    print(f"[FILTER DEBUG] Applying face mask: filter='{filter_name}' -> asset='{mask.name}', dir='{mask.asset_dir}'")
+                                    faces, landmarks = filter_app.current_detections(frame)
+                                    if faces or landmarks:
+                                        print(f"[FILTER DEBUG] Found {max(len(faces), len(landmarks))} face(s), applying mask '{mask.name}' from '{mask.asset_dir}'...")
+                                        # Apply mask to all detected faces in one pass
+                                        frame = filter_app.apply_mask_entry(frame, mask, faces=faces, landmarks=landmarks)
+                                        print(f"[FILTER DEBUG] Face mask '{mask.name}' applied successfully for filter: {filter_name}")
+                                    else:
+                                        print(f"[FILTER DEBUG] No faces detected for filter: {filter_name}")
+                                elif 'face_mask' in filter_name:
+                                    print(f"[FILTER DEBUG] Unknown face mask filter: {filter_name}")
                                 elif filter_name in animated_filters:
                                     dummy_face = (0, 0, frame.shape[1], frame.shape[0])
                                     filter_method = getattr(filter_app, f'apply_{filter_name}', None)
                                     if filter_method and callable(filter_method):
-                                        frame = filter_method(frame.copy(), dummy_face, frame_count)
+                                        frame = filter_method(frame, dummy_face, frame_count)
                                 elif filter_name in full_image_filters:
                                     dummy_face = (0, 0, frame.shape[1], frame.shape[0])
                                     filter_method = getattr(filter_app, f'apply_{filter_name}', None)
                                     if filter_method and callable(filter_method):
-                                        frame = filter_method(frame.copy(), dummy_face)
+                                        frame = filter_method(frame, dummy_face)
                                 else:
                                     # Try to find filter method by name
                                     filter_method = getattr(filter_app, f'apply_{filter_name}', None)
                                     if filter_method and callable(filter_method):
-                                        face = filter_app.detect_face(frame)
+                                        face = filter_app.track_face(frame)
                                         if face:
-                                            frame = filter_method(frame.copy(), face)
+                                            frame = filter_method(frame, face)
                                     else:
                                         print(f"Warning: Filter method 'apply_{filter_name}' not found")
                             except Exception as e:
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark every face detector backend on this machine against the bundled test set
+and report speed, recall and precision. The test set's boxes are Haar's own output, so
+recall and precision measure agreement with Haar, not ground-truth accuracy. With --save
+the fastest backend that meets both thresholds becomes the default picked by
+FaceFilter(face_detector='auto').
+"""
+
+import sys
+import os
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'python-backend'))
+
+import face_detectors
+from face_filters import FaceFilter
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark face detector backends')
+    parser.add_argument('--min-recall', type=float, default=0.9, help='Minimum recall (default: 0.9)')
+    parser.add_argument('--min-precision', type=float, default=0.8, help='Minimum precision (default: 0.8)')
+    parser.add_argument('--model-dir', default=face_detectors.MODEL_DIR,
+                        help='Directory with the LBP cascade and DNN model files')
+    parser.add_argument('--save', action='store_true', help='Save the chosen backend to config.json')
+    args = parser.parse_args()
+
+    face_filter = FaceFilter(face_detector='haar')
+    results = face_detectors.benchmark_detectors(face_filter.get_detection_scale, model_dir=args.model_dir)
+
+    print(f"{'detector':12s} {'ms/frame':>9s} {'recall':>7s} {'precision':>9s}")
+    for result in results:
+        if not result.available:
+            print(f"{result.name:12s} {'not available (model file or library missing)':>27s}")
+            continue
+        print(f"{result.name:12s} {result.ms_per_frame:9.2f} {result.recall:7.2f} {result.precision:9.2f}")
+
+    chosen = face_detectors.choose_detector(results, args.min_recall, args.min_precision)
+    if chosen is None:
+        print("No detector meets the thresholds; FaceFilter falls back to 'haar'")
+        return
+    print(f"Fastest detector meeting the thresholds: {chosen}")
+    if args.save:
+        face_filter.update_config(face_detector=chosen)
+        print(f"Saved to {face_filter.config_path}")
+
+
+if __name__ == '__main__':
+    main()
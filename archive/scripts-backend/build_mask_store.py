@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Precompile every face mask under assets/<folder>/face_mask/ into the memory-mapped
+mask store, so servers map decoded pixels instead of decoding PNGs on first use.
+Rerun after adding or editing masks; masks changed since the last build are decoded as before.
+"""
+
+import sys
+import os
+import argparse
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'python-backend'))
+
+import mask_store
+from mask_index import MaskIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the precompiled face mask store')
+    parser.add_argument('--asset-root', default=mask_store.ASSET_ROOT,
+                        help='Directory containing <folder>/face_mask/*.png')
+    parser.add_argument('--store-dir', default=mask_store.STORE_DIR, help='Where to write the pack and index')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    paths = [entry.path for entry in MaskIndex(args.asset_root).entries.values()]
+    count = mask_store.build_mask_store(paths, args.asset_root, args.store_dir)
+    size = os.path.getsize(os.path.join(args.store_dir, mask_store.PACK_FILE))
+    print(f"Stored {count} masks ({size / 1024 / 1024:.1f} MB) in {args.store_dir} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
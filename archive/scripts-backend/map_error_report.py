@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Report the error of low-resolution warp map generation for every map-based filter.
+Each warp is built at 1/N resolution, upsampled bilinearly and compared with the
+full-size maps, along with the build times of both.
+"""
+
+import sys
+import os
+import time
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'python-backend'))
+
+from face_filters import FaceFilter
+
+
+def time_build(face_filter: FaceFilter, name: str, width: int, height: int, scale: int) -> float:
+    """Build a warp's maps once and return the time taken in milliseconds."""
+    builder = getattr(face_filter, f'_build_{name}_maps')
+    start = time.perf_counter()
+    face_filter.build_maps(builder, width, height, scale)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure low-resolution warp map error per filter')
+    parser.add_argument('--width', type=int, default=3840, help='Frame width (default: 3840)')
+    parser.add_argument('--height', type=int, default=2160, help='Frame height (default: 2160)')
+    parser.add_argument('--scales', type=int, nargs='+', default=[4, 8], help='Downscale factors (default: 4 8)')
+    args = parser.parse_args()
+
+    face_filter = FaceFilter()
+    names = sorted(attr[len('_build_'):-len('_maps')] for attr in dir(face_filter)
+                   if attr.startswith('_build_') and attr.endswith('_maps') and attr != '_build_chain_maps')
+
+    print(f"Warp map error at {args.width}x{args.height} (max error in pixels)")
+    header = f"{'filter':20s} {'full ms':>8s}"
+    for scale in args.scales:
+        header += f" {f'1/{scale} err':>10s} {f'1/{scale} ms':>8s}"
+    print(header)
+
+    for name in names:
+        face_filter.polar_grids.clear()
+        row = f"{name:20s} {time_build(face_filter, name, args.width, args.height, 1):8.1f}"
+        for scale in args.scales:
+            face_filter.polar_grids.clear()
+            build_ms = time_build(face_filter, name, args.width, args.height, scale)
+            error = face_filter.measure_map_error(name, args.width, args.height, scale)
+            row += f" {error:10.3f} {build_ms:8.1f}"
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
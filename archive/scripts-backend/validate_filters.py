@@ -17,6 +17,7 @@ from typing import List, Tuple
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from face_filters import FaceFilter
+from mask_index import get_mask_index
 
 
 def create_test_frame(width=640, height=480) -> np.ndarray:
@@ -53,7 +54,7 @@ def test_filter_application(filter_name: str, test_frame: np.ndarray, filter_app
         }
         
         full_image_filters = {
-            'bulge', 'stretch', 'swirl', 'fisheye', 'pinch', 'wave', 'mirror',
+            'ultimate_distortion', 'bulge', 'stretch', 'swirl', 'fisheye', 'pinch', 'wave', 'mirror',
             'twirl', 'ripple', 'sphere', 'tunnel', 'water_ripple', 'radial_blur',
             'cylinder', 'barrel', 'pincushion', 'whirlpool', 'radial_zoom',
             'concave', 'convex', 'spiral', 'radial_stretch', 'radial_compress',
@@ -71,26 +72,15 @@ def test_filter_application(filter_name: str, test_frame: np.ndarray, filter_app
             'pixelate', 'blur', 'sharpen', 'emboss'
         }
         
-        # Face mask filters are handled dynamically
         frame = test_frame.copy()
         frame_count = 0
         
-        if 'face_mask' in filter_name:
-            # Parse filter name to extract folder and mask name
-            parts = filter_name.split('_')
-            if len(parts) >= 3:
-                folder = parts[0]
-                mask_name = parts[-1]
-                if folder == 'dropout':
-                    asset_dir = 'assets/dropout/face_mask'
-                elif folder == 'assets':
-                    asset_dir = 'assets/face_mask'
-                else:
-                    asset_dir = f'assets/{folder}/face_mask'
-                faces = filter_app.detect_all_faces(frame)
-                if faces:
-                    for face in faces:
-                        frame = filter_app.apply_face_mask_from_asset(frame.copy(), face, mask_name, asset_dir=asset_dir)
+        # Face mask filters (<folder>_face_mask_<name>) are resolved through the asset index
+        mask = get_mask_index(watch=False).get(filter_name)
+        if mask is not None:
+            frame = filter_app.apply_mask_entry(frame, mask)
+        elif 'face_mask' in filter_name:
+            return False, f"Face mask not found in asset index: {filter_name}"
         elif filter_name in animated_filters:
             dummy_face = (0, 0, frame.shape[1], frame.shape[0])
             filter_method = getattr(filter_app, f'apply_{filter_name}', None)